@@ -0,0 +1,203 @@
+"""
+Library entry points: extract invoices without input/output folders.
+
+``extract`` parses one PDF, given as a path, its bytes or a binary file
+object, and returns an ``InvoiceResult`` holding the header fields, the items
+table, rejected numeric cells and stage metrics. ``iter_extract`` processes
+many PDFs and yields each result as soon as its document finishes (in input
+order with ``ordered=True``); ``extract_many`` collects them into a list.
+Nothing is written to disk: the workbook, run summary and result cache
+belong to ``PDFProcessor.process_all_pdfs``, and learned table layouts are
+kept in memory unless ``settings`` enable the layout cache file.
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from config import PDF_FIELDS, PDF_SETTINGS
+from item_table import ItemTable
+from metrics import DocumentMetrics
+from pdf_processor import PDFProcessor
+from writers import ItemsCollector
+
+Source = Union[str, Path, bytes, BinaryIO]
+
+
+@dataclass
+class InvoiceResult:
+    """What one PDF yielded; ``error`` is set (and the rest empty) if it failed."""
+    name: str  # file name, or the name given for in-memory input
+    index: int = 0  # position of the source in the batch
+    fields: Dict[str, Any] = field(default_factory=dict)  # PDF_FIELDS name -> value
+    items: ItemTable = field(default_factory=lambda: ItemTable([]))
+    rejects: List[Dict[str, Any]] = field(default_factory=list)  # numeric cells that could not be converted
+    metrics: Optional[DocumentMetrics] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def items_frame(self) -> pd.DataFrame:
+        """The items table as a DataFrame, one column per item header."""
+        frame = pd.DataFrame(dict(enumerate(self.items.columns)))
+        frame.columns = self.items.headers
+        return frame
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form."""
+        return {
+            "name": self.name,
+            "fields": self.fields,
+            "items": self.items.to_dict(),
+            "rejects": self.rejects,
+            "metrics": self.metrics.to_dict() if self.metrics else None,
+            "error": self.error,
+        }
+
+
+def items_frame(results: Iterable[InvoiceResult]) -> pd.DataFrame:
+    """Items of all ``results`` as one long-format DataFrame, as the csv/parquet/sqlite outputs write it."""
+    collector = ItemsCollector(list(PDF_FIELDS))
+    for result in results:
+        if result.ok:
+            collector.add(result.name, {**result.fields, "items": result.items})
+    return collector.frame()
+
+
+def _settings(settings: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """PDF_SETTINGS with ``settings`` applied; learned layouts stay in memory unless asked for."""
+    return {**PDF_SETTINGS, "layout_cache": "memory", **(settings or {})}
+
+
+def _to_result(index: int, name: str, data: Optional[Dict[str, Any]], error: Optional[str] = None) -> InvoiceResult:
+    if data is None:
+        return InvoiceResult(name, index, error=error)
+    fields = {key: value for key, value in data.items() if key not in ("items", "rejects", "metrics")}
+    return InvoiceResult(
+        name, index, fields, data.get("items") or ItemTable([]), data.get("rejects") or [], data.get("metrics")
+    )
+
+
+def _extract(processor: PDFProcessor, source: Source, name: Optional[str], index: int = 0) -> InvoiceResult:
+    with processor.open_document(source, name=name) as doc:
+        return _to_result(index, doc.path.name, processor.process_pdf(doc))
+
+
+def extract(source: Source, name: Optional[str] = None, settings: Optional[Dict[str, Any]] = None,
+            processor: Optional[PDFProcessor] = None) -> InvoiceResult:
+    """Extract one PDF given as a path, bytes or binary file object.
+
+    ``name`` labels in-memory input in logs and the result. ``settings``
+    override PDF_SETTINGS; pass a ``processor`` instead to reuse its compiled
+    field patterns and learned layouts across calls. Errors are raised.
+    """
+    return _extract(processor or PDFProcessor(_settings(settings)), source, name)
+
+
+def iter_extract(sources: Iterable[Union[Source, Tuple[str, Source]]], workers: int = 1,
+                 settings: Optional[Dict[str, Any]] = None, ordered: bool = False) -> Iterator[InvoiceResult]:
+    """Yield an ``InvoiceResult`` per source as each document finishes.
+
+    A source is a path, bytes, a binary file object, or a ``(name, source)``
+    pair. With ``workers`` > 1 documents are parsed in a process pool, at most
+    ``workers`` at a time, and sources are only read as they are submitted;
+    file objects are read in this process first. Results come in completion
+    order, or in input order with ``ordered=True``; ``InvoiceResult.index``
+    gives the input position. A failing document yields a result with
+    ``error`` set instead of stopping the batch.
+    """
+    config = _settings(settings)
+    tasks = (_task(idx, source) for idx, source in enumerate(sources))
+    results = _iter_serial(config, tasks) if int(workers or 1) < 2 else _iter_parallel(config, tasks, int(workers))
+    if not ordered:
+        yield from results
+        return
+    pending: Dict[int, InvoiceResult] = {}
+    next_idx = 0
+    for result in results:
+        pending[result.index] = result
+        while next_idx in pending:
+            yield pending.pop(next_idx)
+            next_idx += 1
+
+
+def extract_many(sources: Iterable[Union[Source, Tuple[str, Source]]], workers: int = 1,
+                 settings: Optional[Dict[str, Any]] = None) -> List[InvoiceResult]:
+    """``iter_extract`` collected into a list in input order."""
+    return list(iter_extract(sources, workers, settings, ordered=True))
+
+
+def _task(index: int, source: Union[Source, Tuple[str, Source]]) -> Tuple[int, Optional[str], Source]:
+    """``(index, name, source)``; file objects become bytes so they can go to a worker process."""
+    name = None
+    if isinstance(source, tuple):
+        name, source = source
+    if hasattr(source, "read"):
+        name = name or Path(str(getattr(source, "name", "") or "<memory>")).name
+        source = source.read()
+    elif isinstance(source, str):
+        source = Path(source)
+    return index, name, source
+
+
+def _label(name: Optional[str], source: Source) -> str:
+    return name or (source.name if isinstance(source, Path) else "<memory>")
+
+
+def _iter_serial(config: Dict[str, Any], tasks: Iterable[Tuple[int, Optional[str], Source]]) -> Iterator[InvoiceResult]:
+    processor = PDFProcessor(config)
+    for index, name, source in tasks:
+        try:
+            yield _extract(processor, source, name, index)
+        except Exception as e:
+            yield InvoiceResult(_label(name, source), index, error=str(e))
+
+
+def _iter_parallel(config: Dict[str, Any], tasks: Iterable[Tuple[int, Optional[str], Source]], workers: int) -> Iterator[InvoiceResult]:
+    """Run tasks in a pool; if a worker dies, its in-flight documents fail and a new pool takes the rest."""
+    tasks = iter(tasks)
+    exhausted = False
+    while not exhausted:
+        in_flight: Dict[Future, Tuple[int, Optional[str], Source]] = {}
+        crashed = False
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+            while True:
+                while not crashed and not exhausted and len(in_flight) < workers:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    in_flight[pool.submit(_extract_worker, *task)] = task
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    index, name, source = in_flight.pop(fut)
+                    try:
+                        yield fut.result()
+                    except BrokenProcessPool:
+                        crashed = True
+                        yield InvoiceResult(_label(name, source), index, error="worker process crashed")
+                    except Exception as e:
+                        yield InvoiceResult(_label(name, source), index, error=str(e))
+
+
+_worker_processor: Optional[PDFProcessor] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """Pool initializer: one processor per worker, so compiled patterns and layouts are reused."""
+    global _worker_processor
+    _worker_processor = PDFProcessor(config)
+
+
+def _extract_worker(index: int, name: Optional[str], source: Source) -> InvoiceResult:
+    try:
+        return _extract(_worker_processor, source, name, index)
+    except Exception as e:
+        return InvoiceResult(_label(name, source), index, error=str(e))
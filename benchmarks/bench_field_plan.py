@@ -0,0 +1,150 @@
+"""Microbenchmark: per-call field regexes versus the precompiled extraction plan.
+
+Builds synthetic invoice text (header fields followed by item lines) and
+times resolving all PDF_FIELDS with ``per_call_field_value`` (the field
+search the pipeline used before the plan: patterns built per call, lines
+lowercased per label) against ``FieldExtractionPlan.extract`` (patterns
+compiled once, one label scan). ``per_call_field_value`` is also the
+reference the plan's results are checked against.
+
+Usage:
+    python benchmarks/bench_field_plan.py [--lines N] [--repeat N]
+"""
+import argparse
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import PDF_FIELDS  # noqa: E402
+from field_plan import FieldExtractionPlan  # noqa: E402
+
+
+def _convert(value: str, field_type: Any, raw_on_error: bool = False) -> Any:
+    """Typed ``value``; if conversion fails, its digits (or ``value`` itself with ``raw_on_error``)."""
+    digits = value
+    try:
+        if field_type == int:
+            digits = re.sub(r"[^0-9.-]", "", value)
+            return int(float(digits)) if digits else None
+        if field_type == float:
+            digits = re.sub(r"[^0-9.-]", "", value)
+            return float(digits) if digits else None
+        return value
+    except (ValueError, TypeError):
+        return value if raw_on_error else digits
+
+
+def per_call_field_value(text: str, field_config: Dict[str, Any]) -> Any:
+    """One field's value, searched the way the pipeline did before ``FieldExtractionPlan``."""
+    label = field_config.get("label", "")
+    labels = field_config.get("labels", ([label] if label else []))
+    field_type = field_config.get("type", str)
+    value_regex = field_config.get("value_regex")
+    try:
+        if field_config.get("is_regex", False):
+            match = re.search(label, text, re.IGNORECASE | re.DOTALL)
+            if not match:
+                return ""
+            try:
+                return match.group(int(field_config.get("group", 0))).strip()
+            except IndexError:
+                return match.group(0).strip()
+        for lbl in [lv for lv in labels if lv] or ([label] if label else []):
+            patterns = [
+                re.escape(lbl) + r"\s*[:\-]?\s*(.+?)(?:\n|$)",  # Label: Value
+                re.escape(lbl) + r"\s+(\S+)",  # Label Value
+                re.escape(lbl) + r"\s*\n\s*(\S+)",  # Label\nValue
+            ]
+            for pattern in patterns:
+                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+                if match:
+                    value = match.group(1).strip()
+                    if value_regex and not re.search(value_regex, value, re.IGNORECASE):
+                        continue
+                    return _convert(value, field_type)
+            # Look ahead up to 7 lines after the first line holding the label
+            lines = text.splitlines()
+            lbl_lower = lbl.lower()
+            for idx, line in enumerate(lines):
+                if lbl_lower in line.lower():
+                    window = lines[idx + 1: idx + 8]
+                    if value_regex:
+                        m = re.search(value_regex, "\n".join(window), re.IGNORECASE)
+                        if m:
+                            return _convert(m.group(0).strip(), field_type)
+                    for cand in window:
+                        cand = cand.strip()
+                        if not cand or (value_regex and not re.search(value_regex, cand, re.IGNORECASE)):
+                            continue
+                        return _convert(cand, field_type, raw_on_error=True)
+                    break
+        return ""
+    except Exception:
+        return ""
+
+
+def synthetic_invoice_text(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    out = [
+        "Kroger Remittance Detail",
+        "Invoice number 060-C2505-83977",
+        "Invoice date 05/14/2025",
+        "Coupon description P4W2-P4W4 BUY 5 SAVE 5 MEGA",
+        "Campaign description",
+        "Line no UPC Location Item description Item Quanity Bill Amount",
+        "P4W2-P4W4",
+        "Associated Promotions",
+    ]
+    for i in range(1, lines + 1):
+        out.append(
+            f"{i} {rng.randint(10**10, 10**11 - 1)} {rng.randint(100, 999)}-{rng.randint(10, 99)} "
+            f"ITEM {rng.randint(1000, 9999)} ASSORTED {rng.randint(1, 240)} ${rng.uniform(0, 900):,.2f} "
+            f"PO{rng.randint(100000, 999999)} KROGER #{rng.randint(100, 999)}"
+        )
+    return "\n".join(out) + "\n"
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[50, 1000, 20000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    plan = FieldExtractionPlan(PDF_FIELDS)
+
+    print(f"{'lines':>8} {'per-call ms':>12} {'plan ms':>10} {'speedup':>8}")
+    for n in args.lines:
+        text = synthetic_invoice_text(n)
+
+        def old():
+            return {name: per_call_field_value(text, cfg) for name, cfg in PDF_FIELDS.items()}
+
+        def new():
+            return plan.extract(text)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert old() == new(), "plan and per-call extraction disagree"
+        t_old = best_of(old, args.repeat)
+        t_new = best_of(new, args.repeat)
+        print(f"{n:8d} {t_old * 1e3:12.3f} {t_new * 1e3:10.3f} {t_old / t_new:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
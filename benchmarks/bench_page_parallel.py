@@ -0,0 +1,81 @@
+"""Benchmark: serial versus split (``page_workers``) table search of one PDF.
+
+Times ``extract_table_data_plumber`` with the page search in this process and
+split across ``--workers`` processes, and checks that both return the same
+items table. Besides the given PDFs it always runs a synthetic invoice built
+to trip the replay of the split search: a ruled table without the expected
+headers directly before the items table, so a slice starts on a page the
+pre-scan rejects but the worker has to analyze.
+
+Usage:
+    python benchmarks/bench_page_parallel.py [PDF ...] [--workers N] [--min-pages N]
+
+Exits with status 1 if any PDF gives different tables.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import PDF_SETTINGS  # noqa: E402
+from pdf_processor import PDFProcessor  # noqa: E402
+from synthetic_invoice import (  # noqa: E402
+    FILLER_LINES, HEADERS, MARGIN, PAGE_HEIGHT, _assemble, _item_row, _table_stream, _text,
+)
+
+
+def noise_then_items_pdf(path: Path, pages: int = 12, noise_page: int = 5, rows: int = 10) -> Path:
+    """Text-only pages, a ruled table of numbers on ``noise_page`` and the items table on the next page."""
+    rng = random.Random(0)
+    streams = []
+    for page_no in range(1, pages + 1):
+        top = PAGE_HEIGHT - MARGIN
+        if page_no == noise_page:
+            noise = [[str(rng.randint(0, 99999)) for _ in HEADERS] for _ in range(rows)]
+            streams.append(_table_stream(noise, top))
+        elif page_no == noise_page + 1:
+            items = [list(HEADERS)] + [_item_row(rng, i) for i in range(1, rows + 1)]
+            streams.append(_text(MARGIN, top, "Associated Promotions", 10) + _table_stream(items, top - 20))
+        else:
+            streams.append(_text(MARGIN, top, FILLER_LINES[page_no % len(FILLER_LINES)], 8))
+    path.write_bytes(_assemble(streams))
+    return path
+
+
+def run(pdf_path: Path, workers: int, min_pages: int):
+    settings = dict(PDF_SETTINGS, layout_cache=False, page_parallel_min_pages=min_pages)
+    timings, tables = [], []
+    for page_workers in (1, workers):
+        processor = PDFProcessor(dict(settings, page_workers=page_workers))
+        start = time.perf_counter()
+        table = processor.extract_table_data_plumber(pdf_path)
+        timings.append(time.perf_counter() - start)
+        tables.append((table.headers, table.columns))
+    return timings, len(tables[0][1][0]) if tables[0][1] else 0, tables[0] == tables[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", type=Path)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--min-pages", type=int, default=2, help="page_parallel_min_pages for the split run")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        pdfs = [noise_then_items_pdf(Path(tmp) / "noise_then_items.pdf")] + args.pdfs
+        print(f"{'pdf':<28} {'rows':>6} {'serial s':>9} {'split s':>8} {'same':>5}")
+        for pdf_path in pdfs:
+            (t_serial, t_split), rows, same = run(pdf_path, args.workers, args.min_pages)
+            failed |= not same
+            print(f"{pdf_path.name:<28} {rows:6d} {t_serial:9.2f} {t_split:8.2f} {'yes' if same else 'NO':>5}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: one open/parse per PDF versus the old two-pass pipeline.
+
+The legacy path opened each file in ``extract_text_from_pdf`` and again in
+``extract_table_data_plumber``, extracting every page's text twice. The
+current ``process_pdf`` opens the file once and shares page text with the
+anchor search and table detection.
+
+Usage:
+    python benchmarks/bench_single_open.py [PDF ...] [--repeat N]
+
+Without PDF arguments, every PDF in ``PDF_SETTINGS['input_dir']`` is used,
+or synthetic invoices from ``synthetic_invoice.py`` if that folder is empty.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import PDF_FIELDS, PDF_SETTINGS, TABLE_CONFIG  # noqa: E402
+from pdf_processor import PDFProcessor  # noqa: E402
+from synthetic_invoice import write_invoice_batch  # noqa: E402
+
+
+def legacy_process(processor: PDFProcessor, pdf_path: Path) -> None:
+    """Replicate the old pipeline: separate opens for text and tables."""
+    text = processor.extract_text_from_pdf(pdf_path)
+    fields = {name: processor.extract_field_value(text, cfg) for name, cfg in PDF_FIELDS.items()}
+    anchor = (TABLE_CONFIG.get("section_anchor") or "").strip() or fields.get("coupon_description") or None
+    rows = processor.extract_table_data_plumber(pdf_path, anchor_after_text=anchor)
+    if not rows:
+        processor.extract_table_data(text)
+
+
+def time_call(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = PDFProcessor(PDF_SETTINGS)
+    pdfs = args.pdfs or sorted(processor.input_dir.glob("*.pdf"))
+    tmp = None
+    if not pdfs:
+        tmp = tempfile.TemporaryDirectory()
+        print(f"No PDF files found in {processor.input_dir}; using synthetic invoices")
+        pdfs = write_invoice_batch(tmp.name, 3, rows=120, filler_pages=3)
+
+    total_old = total_new = 0.0
+    print(f"{'file':40} {'two-pass s':>11} {'single s':>10} {'saved':>7}")
+    for pdf_path in pdfs:
+        old = time_call(lambda: legacy_process(processor, pdf_path), args.repeat)
+        new = time_call(lambda: processor.process_pdf(pdf_path), args.repeat)
+        total_old += old
+        total_new += new
+        print(f"{pdf_path.name[:40]:40} {old:11.3f} {new:10.3f} {1 - new / old:7.1%}")
+    print(f"{'TOTAL':40} {total_old:11.3f} {total_new:10.3f} {1 - total_new / total_old:7.1%}")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
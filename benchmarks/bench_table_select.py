@@ -0,0 +1,126 @@
+"""Microbenchmark: candidate-table selection on pages with many tables.
+
+Builds pages of extracted cells as ``find_tables()``/``extract()`` return
+them: ``--tables`` decoy tables with random headers plus the items table.
+Times the previous selection, which scored each candidate with a per-cell
+substring scan and built every candidate's rows before comparing scores,
+against ``HeaderIndex.best_table`` (joined-header scoring, memoized per
+header row, rows built only for the winner). Both must pick the same table
+and rows.
+
+Usage:
+    python benchmarks/bench_table_select.py [--tables N ...] [--rows N] [--pages N] [--repeat N]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import TABLE_CONFIG  # noqa: E402
+from header_index import HeaderIndex  # noqa: E402
+from synthetic_invoice import HEADERS, _item_row  # noqa: E402
+
+DECOY_WORDS = ["Date", "Total", "Qty", "Amount", "Store", "Description", "Code", "Ref",
+               "Number", "Vendor", "Name", "Rate", "Region", "Week", "Division", "Allowance"]
+
+
+def norm_cell(s: Any) -> str:
+    return re.sub(r"\s+", " ", str(s or "")).strip()
+
+
+def build_rows(table: List[List[Any]], start: int, headers: List[str]) -> List[List[str]]:
+    rows = []
+    for row in table[start:]:
+        values = [norm_cell(cell) for cell in row or []]
+        if not any(values):
+            continue
+        values = (values + [""] * len(headers))[:len(headers)]
+        rows.append(values)
+    return rows
+
+
+def synthetic_page(rng: random.Random, decoys: int, rows: int) -> List[List[List[Any]]]:
+    tables = []
+    for _ in range(decoys):
+        cols = rng.randint(5, 10)
+        header = [" ".join(rng.sample(DECOY_WORDS, 2)) for _ in range(cols)]
+        body = [[f"{rng.randint(0, 99999)}" for _ in range(cols)] for _ in range(rows)]
+        tables.append([header] + body)
+    items = [list(HEADERS)] + [_item_row(rng, i) for i in range(1, rows + 1)]
+    tables.insert(rng.randrange(len(tables) + 1), items)
+    return tables
+
+
+def legacy_pick(tables: List[List[List[Any]]], expected: List[str], best_score: int = -1) -> Optional[tuple]:
+    """The previous selection: score and build rows for every candidate."""
+    best = None
+    for t_idx, table in enumerate(tables):
+        r_idx = next((i for i, row in enumerate(table) if row and any(c and str(c).strip() for c in row)), None)
+        if r_idx is None:
+            continue
+        headers = [norm_cell(cell) for cell in table[r_idx]]
+        h_low = [h.lower() for h in headers]
+        score = sum(1 for exp in expected if any(exp in h for h in h_low))
+        candidate_rows = build_rows(table, r_idx + 1, headers)
+        if len(headers) < 5 or len(candidate_rows) < 2:
+            continue
+        if score > best_score:
+            best, best_score = (t_idx, headers, candidate_rows), score
+    return best
+
+
+def indexed_pick(tables: List[List[List[Any]]], index: HeaderIndex) -> Optional[tuple]:
+    pick = index.best_table(tables, norm_cell)
+    if pick is None:
+        return None
+    t_idx, r_idx, headers, _ = pick
+    return t_idx, headers, build_rows(tables[t_idx], r_idx + 1, headers)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--rows", type=int, default=30, help="data rows per table")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    expected = [h.strip().lower() for h in TABLE_CONFIG.get("expected_headers", [])]
+    print(f"{'tables/page':>12} {'previous ms':>12} {'indexed ms':>11} {'speedup':>8}")
+    for decoys in args.tables:
+        rng = random.Random(decoys)
+        pages = [synthetic_page(rng, decoys, args.rows) for _ in range(args.pages)]
+        index = HeaderIndex(TABLE_CONFIG.get("expected_headers", []))
+        for tables in pages:
+            assert legacy_pick(tables, expected) == indexed_pick(tables, index), "selections disagree"
+
+        def old():
+            return [legacy_pick(tables, expected) for tables in pages]
+
+        def new():
+            # A fresh index per run, so header memoization only helps within the run
+            fresh = HeaderIndex(TABLE_CONFIG.get("expected_headers", []))
+            return [indexed_pick(tables, fresh) for tables in pages]
+
+        t_old = best_of(old, args.repeat)
+        t_new = best_of(new, args.repeat)
+        print(f"{decoys + 1:12d} {t_old * 1e3:12.2f} {t_new * 1e3:11.2f} {t_old / t_new:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
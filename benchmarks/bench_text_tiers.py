@@ -0,0 +1,90 @@
+"""Benchmark: pdfplumber-only extraction versus the fast pypdf text tier.
+
+For each PDF, times three things with both ``text_engine`` settings: the
+plain text pass on its own, field resolution from that text, and the full
+``process_pdf``. It also checks that both tiers produce the same fields and
+items table.
+
+Usage:
+    python benchmarks/bench_text_tiers.py [PDF ...] [--repeat N]
+
+Without PDF arguments, every PDF in ``PDF_SETTINGS['input_dir']`` is used,
+or synthetic invoices from ``synthetic_invoice.py`` if that folder is empty.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import PDF_SETTINGS  # noqa: E402
+from pdf_processor import PDFProcessor  # noqa: E402
+from synthetic_invoice import write_invoice_batch  # noqa: E402
+
+TIERS = ["pdfplumber", "pypdf"]
+
+
+def time_call(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def text_pass(processor: PDFProcessor, pdf_path: Path) -> str:
+    with processor.open_document(pdf_path) as doc:
+        return doc.scan_text_all
+
+
+def fields_pass(processor: PDFProcessor, pdf_path: Path) -> dict:
+    return processor.field_plan.extract(text_pass(processor, pdf_path))
+
+
+def comparable(data: dict) -> tuple:
+    fields = {k: v for k, v in data.items() if k not in ("items", "metrics", "rejects")}
+    items = data.get("items")
+    return fields, list(items.rows()) if items is not None else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    processors = {tier: PDFProcessor(dict(PDF_SETTINGS, text_engine=tier)) for tier in TIERS}
+    pdfs = args.pdfs or sorted(processors["pdfplumber"].input_dir.glob("*.pdf"))
+    tmp = None
+    if not pdfs:
+        tmp = tempfile.TemporaryDirectory()
+        print(f"No PDF files found in {processors['pdfplumber'].input_dir}; using synthetic invoices")
+        pdfs = write_invoice_batch(tmp.name, 3, rows=120, filler_pages=3)
+
+    steps = [("text", text_pass), ("fields", fields_pass), ("process_pdf", lambda p, f: p.process_pdf(f))]
+    totals = {(step, tier): 0.0 for step, _ in steps for tier in TIERS}
+    print(f"{'file':32} {'step':>12} {'pdfplumber s':>13} {'pypdf s':>9} {'speedup':>8}")
+    for pdf_path in pdfs:
+        for step, fn in steps:
+            timed = {tier: time_call(lambda: fn(processors[tier], pdf_path), args.repeat) for tier in TIERS}
+            for tier in TIERS:
+                totals[(step, tier)] += timed[tier]
+            print(f"{pdf_path.name[:32]:32} {step:>12} {timed['pdfplumber']:13.3f} {timed['pypdf']:9.3f}"
+                  f" {timed['pdfplumber'] / timed['pypdf']:7.1f}x")
+        results = [comparable(processors[tier].process_pdf(pdf_path)) for tier in TIERS]
+        if results[0] != results[1]:
+            print(f"{pdf_path.name[:32]:32} WARNING: tiers disagree on fields or items")
+    for step, _ in steps:
+        old, new = totals[(step, "pdfplumber")], totals[(step, "pypdf")]
+        print(f"{'TOTAL':32} {step:>12} {old:13.3f} {new:9.3f} {old / new:7.1f}x")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Throughput benchmark suite on synthetic Kroger-style invoices.
+
+Each scenario generates deterministic invoices with ``synthetic_invoice.py``
+and runs in a fresh Python process, so peak RSS is per scenario and no
+state leaks between runs. Reported per scenario: wall time, pages/sec,
+rows/sec and peak RSS, for ``process_pdf`` on one document and for
+``process_all_pdfs`` on a batch (result cache disabled).
+
+Results can be saved as JSON and compared against an earlier run; a scenario
+whose throughput drops by more than ``--threshold`` is flagged and the
+script exits with status 1.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--quick] [--repeat N] [--output FILE] [--compare FILE]
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+
+# name, mode, documents, rows per document, filler pages per document
+SCENARIOS = [
+    {"name": "single-small", "mode": "process_pdf", "docs": 1, "rows": 20, "filler_pages": 0},
+    {"name": "single-long-table", "mode": "process_pdf", "docs": 1, "rows": 600, "filler_pages": 2},
+    {"name": "single-many-pages", "mode": "process_pdf", "docs": 1, "rows": 60, "filler_pages": 40},
+    {"name": "batch-20", "mode": "process_all_pdfs", "docs": 20, "rows": 60, "filler_pages": 1},
+]
+QUICK = {"single-small", "batch-20"}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if the platform exposes it."""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux and bytes on macOS
+        return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 2**20, 1)
+    except ImportError:
+        return None
+
+
+def run_scenario(spec: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Run one scenario in this process and return its measurements."""
+    sys.path.insert(0, str(REPO_DIR))
+    sys.path.insert(0, str(BENCH_DIR))
+    from synthetic_invoice import write_invoice_batch
+    from config import PDF_SETTINGS
+    from pdf_processor import PDFProcessor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_dir = Path(tmp) / "in"
+        paths = write_invoice_batch(in_dir, spec["docs"], rows=spec["rows"], filler_pages=spec["filler_pages"])
+        settings = dict(PDF_SETTINGS, input_dir=str(in_dir), output_dir=str(Path(tmp) / "out"), use_cache=False)
+        processor = PDFProcessor(settings)
+
+        pages = rows = 0
+        timings: List[float] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if spec["mode"] == "process_pdf":
+                    data = processor.process_pdf(paths[0])
+                    pages = data["metrics"].counts.get("pages", 0)
+                    rows = len(data.get("items") or [])
+                else:
+                    processor.process_all_pdfs(workers=1, use_cache=False)
+            timings.append(time.perf_counter() - start)
+
+        if spec["mode"] == "process_all_pdfs":
+            with contextlib.redirect_stdout(io.StringIO()):
+                for path in paths:
+                    with processor.open_document(path) as doc:
+                        pages += doc.page_count
+            rows = spec["docs"] * spec["rows"]
+
+    wall = statistics.median(timings)
+    return {
+        "name": spec["name"],
+        "mode": spec["mode"],
+        "docs": spec["docs"],
+        "pages": pages,
+        "rows": rows,
+        "wall_s": round(wall, 4),
+        "pages_per_s": round(pages / wall, 2) if wall else None,
+        "rows_per_s": round(rows / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print throughput changes against ``baseline``; return True if any scenario regressed."""
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    regressed = False
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for result in current["results"]:
+        old = base.get(result["name"])
+        if not old or not old.get("pages_per_s") or not result.get("pages_per_s"):
+            print(f"  {result['name']:<20} no baseline")
+            continue
+        change = result["pages_per_s"] / old["pages_per_s"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"  {result['name']:<20} pages/s {old['pages_per_s']:>9.2f} -> {result['pages_per_s']:>9.2f} ({change:+.1%}){flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="run only the small scenarios")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only the named scenarios")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--compare", type=Path, help="JSON results from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="flag a scenario whose pages/sec drops by more than this fraction")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_scenario(json.loads(args.run_one), args.repeat)))
+        return
+
+    scenarios = [s for s in SCENARIOS if not args.quick or s["name"] in QUICK]
+    if args.only:
+        scenarios = [s for s in scenarios if s["name"] in args.only]
+
+    results = []
+    print(f"{'scenario':<20}{'docs':>5}{'pages':>7}{'rows':>7}{'wall s':>9}{'pages/s':>10}{'rows/s':>10}{'peak MB':>9}")
+    for spec in scenarios:
+        out = subprocess.run(
+            [sys.executable, __file__, "--run-one", json.dumps(spec), "--repeat", str(args.repeat)],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{result['name']:<20}{result['docs']:>5}{result['pages']:>7}{result['rows']:>7}"
+              f"{result['wall_s']:>9.3f}{result['pages_per_s']:>10.2f}{result['rows_per_s']:>10.1f}"
+              f"{result['peak_rss_mb'] if result['peak_rss_mb'] is not None else '-':>9}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
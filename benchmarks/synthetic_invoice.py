@@ -0,0 +1,209 @@
+"""Generate synthetic Kroger-style invoice PDFs without third-party dependencies.
+
+The generator writes a minimal PDF by hand: Helvetica text plus ruled table
+grids so pdfplumber's line-based table detection finds the items table the
+same way it does on real invoices. Output is deterministic for a given seed,
+so benchmark runs on different commits parse identical documents.
+
+Usage:
+    python benchmarks/synthetic_invoice.py OUT_DIR [--count N] [--rows N] [--filler-pages N]
+"""
+import random
+from pathlib import Path
+from typing import List, Union
+
+PAGE_WIDTH = 792.0   # landscape letter
+PAGE_HEIGHT = 612.0
+MARGIN = 36.0
+ROW_HEIGHT = 14.0
+FONT_SIZE = 6
+
+HEADERS = [
+    "Line no", "UPC", "Location", "Item description", "Item Quanity",
+    "Bill Amount", "Accrued Amount", "Handling rate", "PO Number", "Store name",
+]
+COLUMN_WIDTHS = [40, 70, 60, 150, 55, 60, 65, 55, 70, 95]
+
+FILLER_LINES = [
+    "Remittance terms and conditions apply to all deductions listed in this document.",
+    "Please reference the invoice number on all correspondence regarding this deduction.",
+    "Amounts are reported in US dollars unless otherwise stated.",
+    "Disputes must be submitted within ninety days of the invoice date.",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text(x: float, y: float, text: str, size: int = FONT_SIZE) -> str:
+    return f"BT /F1 {size} Tf {x:.2f} {y:.2f} Td ({_escape(text)}) Tj ET\n"
+
+
+def _table_stream(rows: List[List[str]], top: float) -> str:
+    """Draw a ruled grid with one text cell per column, starting at ``top``."""
+    out = []
+    x_edges = [MARGIN]
+    for w in COLUMN_WIDTHS:
+        x_edges.append(x_edges[-1] + w)
+    bottom = top - ROW_HEIGHT * len(rows)
+    out.append("0.5 w\n")
+    for i in range(len(rows) + 1):
+        y = top - ROW_HEIGHT * i
+        out.append(f"{x_edges[0]:.2f} {y:.2f} m {x_edges[-1]:.2f} {y:.2f} l S\n")
+    for x in x_edges:
+        out.append(f"{x:.2f} {top:.2f} m {x:.2f} {bottom:.2f} l S\n")
+    for r_idx, row in enumerate(rows):
+        y = top - ROW_HEIGHT * (r_idx + 1) + 4
+        for c_idx, cell in enumerate(row):
+            out.append(_text(x_edges[c_idx] + 2, y, cell))
+    return "".join(out)
+
+
+def _item_row(rng: random.Random, line_no: int) -> List[str]:
+    qty = rng.randint(1, 240)
+    bill = rng.uniform(-50, 900)
+    bill_txt = f"({abs(bill):,.2f})" if bill < 0 else f"${bill:,.2f}"
+    return [
+        str(line_no),
+        f"{rng.randint(10**10, 10**11 - 1)}",
+        f"{rng.randint(100, 999)}-{rng.randint(10, 99)}",
+        f"ITEM {rng.randint(1000, 9999)} ASSORTED {rng.choice(['12OZ', '6CT', '1LB', '24PK'])}",
+        str(qty),
+        bill_txt,
+        f"{abs(bill) * 0.9:,.2f}",
+        f"{rng.uniform(0.01, 0.2):.3f}",
+        f"PO{rng.randint(100000, 999999)}",
+        f"KROGER #{rng.randint(100, 999)}",
+    ]
+
+
+def build_invoice_pdf(
+    invoice_number: str = "060-C2505-83977",
+    rows: int = 50,
+    filler_pages: int = 1,
+    seed: int = 0,
+    repeat_header: bool = True,
+) -> bytes:
+    """Return the bytes of a synthetic invoice PDF.
+
+    Page 1 carries the header fields; ``filler_pages`` text-only pages follow;
+    then the "Associated Promotions" section with an items table of ``rows``
+    rows spanning as many pages as needed.
+    """
+    rng = random.Random(seed)
+    pages: List[str] = []
+
+    y = PAGE_HEIGHT - MARGIN
+    head = []
+    for label, value in (
+        ("Invoice number", invoice_number),
+        ("Invoice date", "05/14/2025"),
+        ("Coupon description", "P4W2-P4W4 BUY 5 SAVE 5 MEGA"),
+    ):
+        head.append(_text(MARGIN, y, f"{label} {value}", 9))
+        y -= 14
+    head.append(_text(MARGIN, y, "Campaign description", 9))
+    y -= 14
+    head.append(_text(MARGIN, y, "P4W2-P4W4", 9))
+    y -= 24
+    for line in FILLER_LINES:
+        head.append(_text(MARGIN, y, line, 8))
+        y -= 12
+    pages.append("".join(head))
+
+    for p in range(filler_pages):
+        body = []
+        fy = PAGE_HEIGHT - MARGIN
+        for i in range(30):
+            body.append(_text(MARGIN, fy, f"{FILLER_LINES[i % len(FILLER_LINES)]} ({p + 1}.{i + 1})", 8))
+            fy -= 14
+        pages.append("".join(body))
+
+    per_page = int((PAGE_HEIGHT - 2 * MARGIN - 40) // ROW_HEIGHT) - 1
+    line_no = 1
+    first = True
+    while line_no <= rows or first:
+        body = []
+        top = PAGE_HEIGHT - MARGIN
+        if first:
+            body.append(_text(MARGIN, top, "Associated Promotions", 10))
+            top -= 20
+        table_rows: List[List[str]] = []
+        if first or repeat_header:
+            table_rows.append(list(HEADERS))
+        while len(table_rows) < per_page and line_no <= rows:
+            table_rows.append(_item_row(rng, line_no))
+            line_no += 1
+        body.append(_table_stream(table_rows, top))
+        pages.append("".join(body))
+        first = False
+
+    return _assemble(pages)
+
+
+def _assemble(page_streams: List[str]) -> bytes:
+    objects: List[bytes] = []
+    n_pages = len(page_streams)
+    # 1: catalog, 2: pages, 3: font, then (page, content) pairs
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n_pages))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, stream in enumerate(page_streams):
+        data = stream.encode("latin-1")
+        objects.append(
+            (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH:.0f} {PAGE_HEIGHT:.0f}] "
+             f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>").encode()
+        )
+        objects.append(b"<< /Length " + str(len(data)).encode() + b" >>\nstream\n" + data + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def write_invoice_pdf(path: Union[str, Path], **kwargs) -> Path:
+    """Write ``build_invoice_pdf(**kwargs)`` to ``path``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_invoice_pdf(**kwargs))
+    return path
+
+
+def write_invoice_batch(out_dir: Union[str, Path], count: int, **kwargs) -> List[Path]:
+    """Write ``count`` invoices with distinct invoice numbers and seeds to ``out_dir``."""
+    paths = []
+    for i in range(count):
+        number = f"060-C2505-{10000 + i}"
+        paths.append(write_invoice_pdf(Path(out_dir) / f"{number}.pdf", invoice_number=number, seed=i, **kwargs))
+    return paths
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic Kroger-style invoice PDFs.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--filler-pages", type=int, default=1)
+    parser.add_argument("--no-repeat-header", action="store_true",
+                        help="do not repeat the table header on continuation pages")
+    args = parser.parse_args()
+    paths = write_invoice_batch(
+        args.out_dir, args.count, rows=args.rows, filler_pages=args.filler_pages,
+        repeat_header=not args.no_repeat_header,
+    )
+    print(f"Wrote {len(paths)} PDFs to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,29 @@ This file defines the structure of the data we want to extract from the PDFs.
 
 # Define the expected fields in the PDF
 # Format: {"field_name": {"label": "Label in PDF", "type": str/int/float}}
+# Optional "pages": N searches only the first N pages for the field. Pages are read
+# one at a time either way, and reading stops once every field has a value.
+# Optional "region": {"page": 1, "bbox": [x0, top, x1, bottom]} (points, origin top-left)
+# reads the value straight from that box of a fixed layout; value_regex still picks the
+# token inside it. If the box is empty, the label search is used. For the sample invoices:
+#   invoice_number: [99, 27, 400, 40], coupon_description: [115, 55, 500, 68],
+#   campaign_description: [30, 83, 400, 96]
 PDF_FIELDS = {
     # Non-regex extraction using labels. The extractor supports value on same line or next line.
     # Use value_regex to pick the correct token near the label (similar to the filename, e.g., 060-C2505-83977)
     "invoice_number": {
         "labels": ["Invoice number"],
         "type": str,
-        "value_regex": r"\b\d{3}-[A-Z0-9]{3,}-\d{2,}\b"
+        "value_regex": r"\b\d{3}-[A-Z0-9]{3,}-\d{2,}\b",
+        "pages": 2,  # header fields are on page 1 or 2
     },
-    "coupon_description": {"labels": ["Coupon description"], "type": str},
+    "coupon_description": {"labels": ["Coupon description"], "type": str, "pages": 2},
     # Campaign codes often look like AlphaNumberAlphaNumber, e.g., P4W2 or chains like P4W2-P4W4
     "campaign_description": {
         "labels": ["Campaign description"],
         "type": str,
-        "value_regex": r"\b(?:[A-Z]\d+[A-Z]\d+)(?:\s*[\-\/&]\s*[A-Z]\d+[A-Z]\d+)*\b"
+        "value_regex": r"\b(?:[A-Z]\d+[A-Z]\d+)(?:\s*[\-\/&]\s*[A-Z]\d+[A-Z]\d+)*\b",
+        "pages": 2,
     },
     # Add more fields as needed based on your PDF structure
 }
@@ -44,17 +53,66 @@ TABLE_CONFIG = {
         "PO Number",
         "Store name"
     ],
+    # Columns converted to numbers during extraction (matched like expected_headers).
+    # Currency ($1,234.50) and negative formats (-5, (5.00), 5.00-, 5 CR) are accepted;
+    # cells that do not parse are left blank and reported as rejects.
+    "numeric_columns": {
+        "Item Quanity": int,
+        "Bill Amount": float,
+        "Accrued Amount": float,
+        "Handling rate": float,
+    },
     # Minimum number of headers that must match to accept a table
     "min_header_matches": 6,
     # Restrict table search to the section whose header contains this text
     "section_anchor": "Associated Promotions",
+    # Skip table detection on pages whose text has too few expected-header words
+    # (pages following a table are always analyzed as possible continuations)
+    "page_prescan": True,
+    "prescan_min_matches": 3,
+    # Append the items table's continuation on following pages (matched by column x-edges, in points)
+    "stitch_pages": True,
+    "stitch_x_tolerance": 3.0,
+    # Word-position fallback when no ruled table is found: header words closer than
+    # fallback_word_gap points form one label (None: text height); lines with fewer
+    # than fallback_min_cells filled columns are skipped (None: half the columns)
+    "fallback_word_gap": None,
+    "fallback_min_cells": None,
 }
 
 # PDF processing settings
 PDF_SETTINGS = {
     "input_dir": "KrogerPDFs",  # Directory containing PDF files
     "output_dir": "extracted_data",  # Where to save extracted data
-    "output_format": "excel",  # Changed to 'excel' for single file output
+    "output_format": "excel",  # excel, csv, parquet, sqlite, or several ("excel,csv"); see --format
+    "items_basename": None,  # File name (no suffix) of the csv/parquet/sqlite items table; defaults to <output_filename stem>_items
     "combined_output": True,  # Combine all data into a single file
-    "output_filename": "all_kroger_data.xlsx"  # Name of the combined output file
+    "output_filename": "all_kroger_data.xlsx",  # Name of the combined output file
+    "workers": 1,  # Worker processes for batch runs (overridden by --workers)
+    "use_cache": True,  # Reuse cached results for unchanged PDFs (disable with --no-cache)
+    "cache_dir": None,  # Result cache location; defaults to <output_dir>/.cache
+    "excel_streaming": False,  # Low-memory write-only workbook for very large batches (--streaming)
+    "metrics_file": None,  # Append per-document stage timings here as JSON lines (--metrics)
+    "print_timings": False,  # Print a stage timing summary after each run (--timings)
+    "log_level": "INFO",  # Console log level; --quiet = WARNING, --verbose = DEBUG
+    "log_file": None,  # Also write the log with timestamps to this file (--log-file)
+    "summary_file": None,  # Per-file run summary (JSON lines); defaults to <output_dir>/run_summary.jsonl
+    "live_pages": 8,  # Pages per PDF that keep pdfplumber's parsed layout; older ones are released (None: keep all)
+    "memory_limit_mb": None,  # Release all cached page data when process RSS exceeds this (MB), at most once per live_pages pages
+    "doc_timeout_s": None,  # Kill a PDF's extraction after this many seconds (--timeout); runs each PDF in a child process
+    "doc_memory_mb": None,  # Kill a PDF's extraction when its process exceeds this RSS (MB) (--max-memory)
+    "timeout_retry_text": True,  # Retry a killed PDF once with the text table parsers (no ruled-table detection) before quarantining it
+    "quarantine_dir": None,  # Where killed PDFs are moved, with reasons in quarantine.jsonl; defaults to <output_dir>/quarantine
+    "dedup": True,  # Skip byte-identical PDFs in a batch (only the first copy by name gets a sheet)
+    "dedup_by_id": False,  # Also treat PDFs with the same trailer /ID pair as duplicates
+    "page_workers": 1,  # Processes that search one long PDF's pages for tables (--page-workers); 1: off
+    "page_parallel_min_pages": 100,  # Only split PDFs with at least this many pages to search
+    "layout_cache": True,  # Reuse learned table geometry for PDFs with a known layout; "memory": do not persist it
+    "layout_cache_file": None,  # Learned layouts (JSON); defaults to <cache_dir>/layouts.json
+    "text_engine": "pdfplumber",  # "pypdf": fast pypdf/PyPDF2 text for fields, anchor and pre-scan; pdfplumber for tables
+    "watch_interval": 1.0,  # --watch: seconds between input folder polls
+    "watch_settle_s": 2.0,  # --watch: a PDF must be unchanged this long before it is processed
+    "watch_queue_size": 100,  # --watch: PDFs waiting for a worker before polling pauses
+    "watch_refresh_s": 10.0,  # --watch: rebuild the workbook after this many idle seconds (None: never)
+    "ingest_file": None,  # --watch: results appended as JSON lines; defaults to <output_dir>/ingested.jsonl
 }
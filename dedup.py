@@ -0,0 +1,111 @@
+"""
+Duplicate detection for batch runs.
+
+Before parsing, byte-identical PDFs are found by SHA-256, hashing only files
+whose size matches another file's. Optionally, PDFs whose trailer ``/ID``
+pair is equal count as duplicates too, which catches the same document saved
+again with different bytes; some generators reuse one ID, so this is off by
+default. Only the first file of each group, in sorted name order, is
+processed. After parsing, ``InvoiceRegistry`` flags files whose
+extracted invoice number was already seen under another name.
+"""
+import logging
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from result_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+_PDF_STRING = rb"(<[0-9A-Fa-f\s]*>|\((?:\\.|[^\\)])*\))"
+_TRAILER_ID = re.compile(rb"/ID\s*\[\s*" + _PDF_STRING + rb"\s*" + _PDF_STRING + rb"\s*\]")
+
+
+def trailer_id(path: Path, tail: int = 8192) -> Optional[Tuple[bytes, bytes]]:
+    """The ``/ID`` pair of the last trailer in the final ``tail`` bytes of ``path``, if any."""
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            fh.seek(max(0, fh.tell() - tail))
+            data = fh.read()
+    except OSError:
+        return None
+    matches = _TRAILER_ID.findall(data)
+    if not matches:
+        return None
+    return tuple(_normalize(part) for part in matches[-1])
+
+
+def _normalize(pdf_string: bytes) -> bytes:
+    """Hex strings without whitespace and in lower case; literal strings as they are."""
+    if pdf_string.startswith(b"<"):
+        return re.sub(rb"\s", b"", pdf_string).lower()
+    return pdf_string
+
+
+def find_duplicates(pdf_files: Sequence[Path], digests: Optional[Dict[Path, str]] = None,
+                    by_id: bool = False) -> Dict[Path, Path]:
+    """Map each duplicate in ``pdf_files`` to the first file (in the given order) it duplicates.
+
+    ``digests`` holds SHA-256 digests already computed (e.g. for the result
+    cache); digests computed here are added to it. Files with a unique size
+    are never hashed.
+    """
+    digests = digests if digests is not None else {}
+    groups: Dict[str, List[Path]] = defaultdict(list)
+    by_size: Dict[int, List[Path]] = defaultdict(list)
+    for pdf_file in pdf_files:
+        try:
+            by_size[pdf_file.stat().st_size].append(pdf_file)
+        except OSError:
+            continue
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        for pdf_file in same_size:
+            try:
+                if pdf_file not in digests:
+                    digests[pdf_file] = file_digest(pdf_file)
+            except OSError as e:
+                logger.warning("Dedup: could not hash %s: %s", pdf_file.name, e)
+                continue
+            groups[digests[pdf_file]].append(pdf_file)
+    duplicates: Dict[Path, Path] = {}
+    for files in groups.values():
+        for pdf_file in files[1:]:
+            duplicates[pdf_file] = files[0]
+    if by_id:
+        first_by_id: Dict[Tuple[bytes, bytes], Path] = {}
+        for pdf_file in pdf_files:
+            if pdf_file in duplicates:
+                continue
+            doc_id = trailer_id(pdf_file)
+            if doc_id is None:
+                continue
+            if doc_id in first_by_id:
+                duplicates[pdf_file] = first_by_id[doc_id]
+            else:
+                first_by_id[doc_id] = pdf_file
+    return duplicates
+
+
+class InvoiceRegistry:
+    def __init__(self):
+        """Invoice numbers seen so far in a batch, with the file each was first seen in."""
+        self.first_seen: Dict[str, str] = {}
+        self.flagged = 0
+
+    def check(self, file_name: str, invoice_number: object) -> Optional[str]:
+        """Record ``file_name``'s invoice number; return the earlier file with the same number, if any."""
+        if invoice_number in ("", None):
+            return None
+        key = str(invoice_number).strip().upper()
+        first = self.first_seen.setdefault(key, file_name)
+        if first == file_name:
+            return None
+        self.flagged += 1
+        logger.warning("%s: invoice number %s was already extracted from %s", file_name, invoice_number, first)
+        return first
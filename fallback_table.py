@@ -0,0 +1,190 @@
+"""
+Bulk text-fallback parsers for the items table.
+
+When pdfplumber finds no ruled table, the columns are inferred once from the
+header row and every data line is cut at the same boundaries, instead of
+splitting each line on runs of spaces:
+
+- ``table_from_words`` uses pdfplumber word boxes: header words are grouped
+  into labels by horizontal gaps, column boundaries sit in the middle of the
+  gaps between labels, and all data words are assigned to columns with one
+  ``searchsorted`` and joined per cell with a pandas groupby.
+- ``table_from_fixed_width`` does the same on character offsets for text
+  with aligned columns, slicing all lines at once as a numpy character grid.
+  Each boundary is placed in the widest run of character positions that are
+  blank on every data line between two header labels, so values wider than
+  their header are not cut.
+
+``table_from_split_rows`` is the per-line fallback for text whose header line
+does not give one span per configured header: each line is split on runs of
+2+ spaces and padded or truncated to the headers.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from item_table import ItemTable
+
+# A header label: words separated by single spaces
+_LABEL_RE = re.compile(r"\S+(?: \S+)*")
+
+
+def header_spans(line: str) -> List[Tuple[str, int, int]]:
+    """``(label, start, end)`` character spans of the labels in a header line (split on 2+ spaces)."""
+    return [(m.group(0), m.start(), m.end()) for m in _LABEL_RE.finditer(line)]
+
+
+def column_bounds(starts: Sequence[float], ends: Sequence[float]) -> np.ndarray:
+    """Boundaries between adjacent columns, in the middle of each gap between header labels."""
+    return (np.asarray(ends[:-1], dtype=float) + np.asarray(starts[1:], dtype=float)) / 2
+
+
+def table_from_fixed_width(lines: Sequence[str], spans: Sequence[Tuple[str, int, int]],
+                           headers: Optional[Sequence[str]] = None) -> ItemTable:
+    """Slice aligned text ``lines`` into the columns of the header ``spans``.
+
+    ``headers`` overrides the span labels (e.g. configured table headers).
+    """
+    headers = list(headers) if headers is not None else [label for label, _, _ in spans]
+    if not lines:
+        return ItemTable(headers)
+    width = max(len(line) for line in lines)
+    # One row per line, one character per cell; short lines are padded with NULs,
+    # which numpy drops again when a slice is viewed back as a string
+    grid = np.array(lines, dtype=f"<U{width}").view("<U1").reshape(len(lines), width)
+    occupied = ((grid != " ") & (grid != "\0")).any(axis=0)
+    bounds = [
+        _blank_gap(occupied, prev_end, start)
+        for (_, _, prev_end), (_, start, _) in zip(spans[:-1], spans[1:])
+    ]
+    edges = [0, *np.clip(bounds, 0, width).tolist(), width]
+    columns = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            columns.append([""] * len(lines))
+            continue
+        cells = np.ascontiguousarray(grid[:, start:end]).view(f"<U{end - start}").ravel()
+        columns.append(np.char.strip(cells).tolist())
+    return ItemTable(headers, columns)
+
+
+def table_from_split_rows(lines: Sequence[str], headers: Sequence[str]) -> ItemTable:
+    """Split each line on 2+ spaces, padding or truncating the values to ``headers``."""
+    width = len(headers)
+    rows = []
+    for line in lines:
+        values = _LABEL_RE.findall(line)[:width]
+        rows.append(values + [""] * (width - len(values)))
+    return ItemTable.from_rows(headers, rows)
+
+
+def _blank_gap(occupied: np.ndarray, lo: int, hi: int) -> int:
+    """Middle of the longest run of unoccupied positions in ``[lo, hi)``, else the middle of the range."""
+    window = occupied[lo:hi]
+    best_len, best_mid, run_start = 0, (lo + hi) // 2, None
+    for pos, used in enumerate(np.append(window, True)):
+        if not used and run_start is None:
+            run_start = pos
+        elif used and run_start is not None:
+            if pos - run_start > best_len:
+                best_len, best_mid = pos - run_start, lo + (run_start + pos) // 2
+            run_start = None
+    return best_mid
+
+
+def _words_frame(words: List[Dict[str, Any]], page_idx: int) -> pd.DataFrame:
+    """Words of one page with a line number per visual line (by ``top``)."""
+    df = pd.DataFrame(words, columns=["text", "x0", "x1", "top", "bottom"])
+    if df.empty:
+        return df.assign(page=page_idx, line=0)
+    df = df.sort_values(["top", "x0"], kind="stable")
+    height = float((df["bottom"] - df["top"]).median() or 1.0)
+    new_line = df["top"].diff().fillna(0).to_numpy() > height / 2
+    df["line"] = np.cumsum(new_line)
+    df = df.sort_values(["line", "x0"], kind="stable").reset_index(drop=True)
+    return df.assign(page=page_idx)
+
+
+def _line_texts(df: pd.DataFrame) -> pd.Series:
+    return df.groupby("line", sort=True)["text"].agg(" ".join).str.lower()
+
+
+def table_from_words(
+    pages: Iterable[Tuple[int, List[Dict[str, Any]]]],
+    start_marker: str,
+    end_marker: str = "",
+    min_cells: Optional[int] = None,
+    word_gap: Optional[float] = None,
+) -> ItemTable:
+    """Build the items table from ``(page_idx, words)`` pairs, starting at the header row.
+
+    The header row is the first line containing ``start_marker``. Header words
+    closer than ``word_gap`` points (default: the header's text height) form
+    one label. Data lines continue on later pages; a repeated header line is
+    skipped, a line containing ``end_marker`` ends the table, and so does a
+    page without data rows after the first rows were found. Lines with fewer than ``min_cells`` filled
+    columns (default: half the columns) are dropped as stray text.
+    """
+    start_marker = start_marker.lower()
+    end_marker = (end_marker or "").lower()
+    headers: List[str] = []
+    bounds = None
+    frames: List[pd.DataFrame] = []
+    for page_idx, words in pages:
+        df = _words_frame(words, page_idx)
+        if df.empty:
+            if bounds is not None:
+                break
+            continue
+        texts = _line_texts(df)
+        if start_marker:
+            is_header = texts.str.contains(start_marker, regex=False)
+        else:
+            is_header = pd.Series(False, index=texts.index)
+        if bounds is None:
+            if not is_header.any():
+                continue
+            header_line = int(is_header.idxmax())
+            hw = df[df["line"] == header_line]
+            gap = word_gap if word_gap is not None else float((hw["bottom"] - hw["top"]).median())
+            label_id = np.cumsum((hw["x0"] - hw["x1"].shift()).fillna(0).to_numpy() > gap)
+            labels = hw.groupby(label_id).agg(text=("text", " ".join), x0=("x0", "min"), x1=("x1", "max"))
+            if len(labels) < 3:
+                continue
+            headers = labels["text"].tolist()
+            bounds = column_bounds(labels["x0"].to_numpy(), labels["x1"].to_numpy())
+            first_line = header_line + 1
+        else:
+            first_line = 0
+        lines = texts[texts.index >= first_line]
+        lines = lines[~is_header.reindex(lines.index, fill_value=False)]
+        if end_marker:
+            ends = lines.index[lines.str.contains(end_marker, regex=False)]
+            if len(ends):
+                lines = lines[lines.index < ends[0]]
+        data = df[df["line"].isin(lines.index)]
+        kept = _assign_cells(data, bounds, len(headers), min_cells)
+        if kept.empty:
+            if frames:
+                break
+            continue  # header at the bottom of a page; rows start on the next one
+        frames.append(kept)
+        if end_marker and len(ends):
+            break
+    if not frames:
+        return ItemTable(headers)
+    table = pd.concat(frames)
+    return ItemTable(headers, [table[i].tolist() for i in range(len(headers))])
+
+
+def _assign_cells(data: pd.DataFrame, bounds: np.ndarray, n_cols: int, min_cells: Optional[int]) -> pd.DataFrame:
+    """Rows of one page: words joined per (line, column), sparse lines dropped."""
+    if data.empty:
+        return pd.DataFrame(columns=range(n_cols))
+    col = np.searchsorted(bounds, ((data["x0"] + data["x1"]) / 2).to_numpy())
+    cells = data.assign(col=col).groupby(["line", "col"], sort=True)["text"].agg(" ".join)
+    rows = cells.unstack("col").reindex(columns=range(n_cols)).fillna("")
+    need = min_cells if min_cells is not None else max(2, n_cols // 2)
+    return rows[(rows != "").sum(axis=1) >= need]
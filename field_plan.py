@@ -0,0 +1,377 @@
+"""
+Precompiled field-extraction plan.
+
+Built once from PDF_FIELDS, the plan holds every label pattern precompiled and
+one combined label alternation. Per document, a single scan of the text with
+that alternation finds each label's first occurrence, stopping as soon as all
+labels are located; the per-label patterns then start there, and the
+look-ahead window fallback reads the lines after that position directly
+instead of splitting and lowercasing the whole text for each label. Results
+match the per-call label search this replaced, kept as the reference in
+``benchmarks/bench_field_plan.py``.
+
+``extract_pages`` reads the document a page at a time instead: fields are
+resolved on the text read so far and no further pages are read once every
+field has a value that later pages cannot change, or has reached its
+``pages`` limit from PDF_FIELDS. Within that limit, results match
+``extract`` on the full text. Each page is scanned for labels once and label
+patterns resume where the previous page left them, so the work stays linear
+in the number of pages read.
+
+Fields with a ``region`` are read from the text inside that box by
+``extract_regions`` first; label search only runs for those whose box is
+empty or does not match ``value_regex``.
+"""
+import bisect
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Line boundaries recognised by str.splitlines()
+_LINE_BREAK = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_WINDOW_LINES = 7
+
+logger = logging.getLogger(__name__)
+
+
+def coerce_value(value: str, field_type: Any, raw_on_error: bool = False) -> Any:
+    """Convert an extracted string to the configured field type.
+
+    If a numeric conversion fails, the digits-only string is returned, or the
+    original value with ``raw_on_error`` (as the heuristic line pick near a
+    label does).
+    """
+    value_n = value
+    try:
+        if field_type == int:
+            value_n = re.sub(r"[^0-9.-]", "", value)
+            return int(float(value_n)) if value_n else None
+        if field_type == float:
+            value_n = re.sub(r"[^0-9.-]", "", value)
+            return float(value_n) if value_n else None
+        return value
+    except (ValueError, TypeError):
+        return value if raw_on_error else value_n
+
+
+class _CompiledField:
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        label = config.get("label", "")
+        labels = config.get("labels", ([label] if label else []))
+        self.labels = [lv for lv in labels if lv] or ([label] if label else [])
+        self.type = config.get("type", str)
+        self.is_regex = config.get("is_regex", False)
+        self.group = int(config.get("group", 0))
+        # Only the first ``pages`` pages are searched (None: the whole document)
+        pages = config.get("pages")
+        self.pages = int(pages) if pages else None
+        # Optional fixed box {"page": 1, "bbox": [x0, top, x1, bottom]} holding the value
+        region = config.get("region")
+        self.region: Optional[Tuple[int, Tuple[float, ...]]] = None
+        if region:
+            self.region = (int(region.get("page", 1)) - 1, tuple(float(v) for v in region["bbox"]))
+        value_regex = config.get("value_regex")
+        self.value_regex = re.compile(value_regex, re.IGNORECASE) if value_regex else None
+        self.regex = re.compile(label, re.IGNORECASE | re.DOTALL) if self.is_regex else None
+        # Tried in this order: "Label: value", "Label value", "Label\nvalue"
+        self.patterns: Dict[str, List[Pattern]] = {
+            lbl: [
+                re.compile(re.escape(lbl) + r"\s*[:\-]?\s*(.+?)(?:\n|$)", re.IGNORECASE | re.DOTALL),
+                re.compile(re.escape(lbl) + r"\s+(\S+)", re.IGNORECASE | re.DOTALL),
+                re.compile(re.escape(lbl) + r"\s*\n\s*(\S+)", re.IGNORECASE | re.DOTALL),
+            ]
+            for lbl in self.labels
+        }
+
+
+class LabelIndex:
+    """First label positions and a lazy line index for one document's text.
+
+    The text is kept in the chunks it was given in (e.g. pages) and joined
+    only as far back as a search needs: ``extend`` scans just the new chunk,
+    plus enough of the old text to catch a label cut by the join.
+    """
+
+    def __init__(self, plan: "FieldExtractionPlan", text: str, labels: List[str]):
+        self.plan = plan
+        self.first: Dict[str, int] = {}
+        self.length = 0
+        # End of the last non-whitespace character
+        self.content_end = 0
+        self._chunks: List[str] = []
+        self._starts: List[int] = []
+        self.extend(text, labels)
+
+    @property
+    def text(self) -> str:
+        """The whole text."""
+        if len(self._chunks) != 1:
+            self._chunks, self._starts = ["".join(self._chunks)], [0]
+        return self._chunks[0]
+
+    def text_from(self, pos: int) -> Tuple[str, int]:
+        """A string holding the text from ``pos`` to the end, and the offset of its first character."""
+        if len(self._chunks) <= 1:
+            return self.text, 0
+        i = max(0, bisect.bisect_right(self._starts, pos) - 1)
+        return "".join([self._chunks[i][pos - self._starts[i]:], *self._chunks[i + 1:]]), pos
+
+    def extend(self, text: str, labels: List[str]) -> None:
+        """Append ``text`` and look for those ``labels`` that have not been seen yet."""
+        plan = self.plan
+        # A label found in the old text was found whole; one that was not may
+        # start at most len(label) - 1 characters before the join
+        start = max(0, self.length - plan.max_label_len + 1)
+        if text:
+            stripped = len(text.rstrip())
+            if stripped:
+                self.content_end = self.length + stripped
+            self._chunks.append(text)
+            self._starts.append(self.length)
+            self.length += len(text)
+        wanted = set(labels) - set(self.first)
+        if not wanted:
+            return
+        shadowed = wanted & set(plan.shadowed)
+        pending = wanted - shadowed
+        scan, offset = self.text_from(start)
+        # One pass over the text with the zero-width alternation (it also sees
+        # overlapping occurrences); stops once every wanted label has been seen
+        if pending:
+            for m in plan.label_scanner.finditer(scan, start - offset):
+                lbl = plan.group_labels[m.lastgroup]
+                if lbl in pending:
+                    self.first[lbl] = offset + m.start()
+                    pending.discard(lbl)
+                    if not pending:
+                        break
+        # Labels that are a prefix of a longer label can be hidden by it at the
+        # same position; look those up on their own
+        for lbl in shadowed:
+            m = plan.shadowed[lbl].search(scan, start - offset)
+            if m:
+                self.first[lbl] = offset + m.start()
+
+    def window_after(self, pos: int, count: int) -> List[str]:
+        """The ``count`` lines after the line containing ``pos``, as splitlines() would return them."""
+        text, offset = self.text_from(pos)
+        breaks = []
+        for m in _LINE_BREAK.finditer(text, pos - offset):
+            breaks.append(m)
+            if len(breaks) > count:
+                break
+        lines = []
+        for i, m in enumerate(breaks[:count]):
+            seg_end = breaks[i + 1].start() if i + 1 < len(breaks) else len(text)
+            if i + 1 == len(breaks) and m.end() == len(text):
+                break  # splitlines() drops the empty tail after a final line break
+            lines.append(text[m.end():seg_end])
+        return lines
+
+
+class FieldExtractionPlan:
+    def __init__(self, fields_config: Dict[str, Dict[str, Any]]):
+        """Compile the patterns for every configured field."""
+        self.fields = [_CompiledField(name, cfg) for name, cfg in fields_config.items()]
+        self.labels: List[str] = []
+        for field in self.fields:
+            if not field.is_regex:
+                self.labels.extend(lbl for lbl in field.labels if lbl not in self.labels)
+        self.max_label_len = max((len(lbl) for lbl in self.labels), default=1)
+        # Longest first so the alternation prefers the most specific label
+        ordered = sorted(self.labels, key=len, reverse=True)
+        self.group_labels = {f"l{i}": lbl for i, lbl in enumerate(ordered)}
+        alternation = "|".join(f"(?P<{g}>{re.escape(lbl)})" for g, lbl in self.group_labels.items())
+        self.label_scanner = re.compile(f"(?=(?:{alternation}))" if alternation else r"(?!)", re.IGNORECASE)
+        self.shadowed = {
+            lbl: re.compile(f"(?=(?:{re.escape(lbl)}))", re.IGNORECASE)
+            for lbl in self.labels
+            if any(other != lbl and other.lower().startswith(lbl.lower()) for other in self.labels)
+        }
+
+    def extract(self, text: str, names: Optional[Iterable[str]] = None, miss_level: int = logging.WARNING) -> Dict[str, Any]:
+        """Resolve every field (or only ``names``) from one document's text.
+
+        Fields that cannot be found are logged at ``miss_level``; a pre-pass
+        whose misses are retried on other text passes ``logging.DEBUG``.
+        """
+        wanted = set(names) if names is not None else None
+        fields = [f for f in self.fields if wanted is None or f.name in wanted]
+        idx = LabelIndex(self, text, [lbl for f in fields if not f.is_regex for lbl in f.labels])
+        results: Dict[str, Any] = {}
+        for field in fields:
+            try:
+                results[field.name] = self._resolve(field, idx, miss_level)
+            except Exception as e:
+                logger.error("Error extracting field with labels %s: %s", field.labels, e)
+                results[field.name] = ""
+        return results
+
+    def extract_regions(self, region_text: Callable[[int, Tuple[float, ...]], str],
+                        names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Resolve the fields that have a ``region`` from ``region_text(page_idx, bbox)``.
+
+        Fields whose box holds no value (or none matching ``value_regex``) are
+        left out of the result so the caller can fall back to label search.
+        """
+        wanted = set(names) if names is not None else None
+        results: Dict[str, Any] = {}
+        for field in self.fields:
+            if field.region is None or (wanted is not None and field.name not in wanted):
+                continue
+            page_idx, bbox = field.region
+            try:
+                text = region_text(page_idx, bbox)
+            except Exception as e:
+                logger.debug("Region of %s could not be read: %s", field.name, e)
+                continue
+            if field.value_regex:
+                match = field.value_regex.search(text)
+                value = match.group(0).strip() if match else ""
+            else:
+                value = " ".join(text.split())
+            if not value:
+                logger.debug("Region of %s is empty; using label search", field.name)
+                continue
+            logger.debug("Found %s in region: %s", field.name, value)
+            results[field.name] = coerce_value(value, field.type)
+        return results
+
+    def extract_pages(self, pages: Iterable[str], names: Optional[Iterable[str]] = None,
+                      miss_level: int = logging.WARNING) -> Dict[str, Any]:
+        """Resolve fields from page texts, pulling pages from ``pages`` only while needed.
+
+        After each page, pending fields are resolved on the text read so far. A
+        value is kept once more text could not change it (see ``_match``): e.g.
+        a value after a lower-priority label waits for the preferred label
+        until the ``pages`` limit. A field is given up at its ``pages`` limit or
+        at the end of the document. Labels are only looked for in the new page
+        and label patterns resume where they stopped, so a field missing from a
+        long document does not rescan the pages already read (``is_regex``
+        fields are still searched from the start).
+        """
+        wanted = set(names) if names is not None else None
+        pending = [f for f in self.fields if wanted is None or f.name in wanted]
+        results: Dict[str, Any] = {}
+        idx = LabelIndex(self, "", [])
+        memos: Dict[str, Dict[Any, Any]] = {field.name: {} for field in pending}
+        read = 0
+        page_iter = iter(pages)
+        while pending:
+            page = next(page_iter, None)
+            if page is not None:
+                read += 1
+            idx.extend(page + "\n" if page is not None else "",
+                       [lbl for f in pending if not f.is_regex for lbl in f.labels])
+            still_pending = []
+            for field in pending:
+                final = page is None or (field.pages is not None and read >= field.pages)
+                try:
+                    value, settled = self._match(field, idx, miss_level if final else logging.DEBUG, memos[field.name])
+                except Exception as e:
+                    logger.error("Error extracting field with labels %s: %s", field.labels, e)
+                    value, final = "", True
+                if final or (value not in ("", None) and settled):
+                    results[field.name] = value
+                else:
+                    still_pending.append(field)
+            pending = still_pending
+        logger.debug("Fields resolved from the first %d page(s)", read)
+        return results
+
+    def _resolve(self, field: _CompiledField, idx: LabelIndex, miss_level: int = logging.WARNING) -> Any:
+        return self._match(field, idx, miss_level)[0]
+
+    def _match(self, field: _CompiledField, idx: LabelIndex, miss_level: int = logging.WARNING,
+               memo: Optional[Dict[Any, Any]] = None) -> Tuple[Any, bool]:
+        """``field``'s value, and whether text appended to ``idx.text`` could no longer change it.
+
+        Labels, patterns and the window fallback are tried in priority order.
+        The value is settled only if every attempt before the winning one is
+        final: its label was found, each pattern already has a first match
+        (a pattern without one, or a label not yet seen, could still match
+        on a later page and win), matches end before the end of the text,
+        and look-ahead windows are complete.
+
+        ``memo`` carries pattern matches from an earlier call on a prefix of
+        ``idx.text`` (see ``_search``).
+        """
+        if field.is_regex:
+            text = idx.text
+            match = field.regex.search(text)
+            if match:
+                try:
+                    value = match.group(field.group).strip()
+                except IndexError:
+                    value = match.group(0).strip()
+                logger.debug("Found (regex) %s: %s", field.regex.pattern, value)
+                return value, match.end() < len(text)
+            logger.log(miss_level, "Could not match regex for %s", field.regex.pattern)
+            return "", False
+
+        settled = True
+        for lbl in field.labels:
+            pos = idx.first.get(lbl)
+            if pos is None:
+                settled = False
+                continue
+            for pattern in field.patterns[lbl]:
+                # No match can start before the label's first occurrence
+                match, offset = self._search(pattern, idx, pos, len(lbl), memo)
+                if match is None or offset + match.end() >= idx.length:
+                    settled = False
+                if match:
+                    value = match.group(1).strip()
+                    if field.value_regex and not field.value_regex.search(value):
+                        continue
+                    logger.debug("Found %s: %s", lbl, value)
+                    return coerce_value(value, field.type), settled
+            # Window fallback: look ahead a few lines after the label's first line
+            window = memo.get(lbl) if memo is not None else None
+            if window is None:
+                window = idx.window_after(pos, _WINDOW_LINES)
+            if len(window) < _WINDOW_LINES:
+                settled = False
+            elif memo is not None:
+                memo[lbl] = window
+            if field.value_regex:
+                m = field.value_regex.search("\n".join(window))
+                if m:
+                    val = m.group(0).strip()
+                    logger.debug("Found near '%s' using value_regex: %s", lbl, val)
+                    return coerce_value(val, field.type), settled
+            for cand in window:
+                cand = cand.strip()
+                if not cand:
+                    continue
+                if field.value_regex and not field.value_regex.search(cand):
+                    continue
+                logger.debug("Heuristic pick near '%s': %s", lbl, cand)
+                return coerce_value(cand, field.type, raw_on_error=True), settled
+        logger.log(miss_level, "Could not find value for any of labels: %s", field.labels)
+        return "", False
+
+    @staticmethod
+    def _search(pattern: Pattern, idx: LabelIndex, pos: int, label_len: int,
+                memo: Optional[Dict[Any, Any]]) -> Tuple[Optional["re.Match"], int]:
+        """``pattern.search(idx.text, pos)`` as a match on a suffix of the text and that suffix's offset.
+
+        With ``memo`` the search resumes from the result of a call on a shorter
+        text: a match that ended before the end of that text is kept. The label
+        patterns can only stop failing at an occurrence followed by nothing but
+        whitespace, so after a miss the search restarts at the last possible
+        such occurrence; after a match that ran to the end of the text it
+        restarts at that match.
+        """
+        prev = memo.get(pattern) if memo is not None else None
+        if prev is not None:
+            match, offset, searched, content_end = prev
+            if match is not None and offset + match.end() < searched:
+                return match, offset
+            pos = offset + match.start() if match is not None else max(pos, content_end - label_len)
+        text, offset = idx.text_from(pos)
+        match = pattern.search(text, pos - offset)
+        if memo is not None:
+            memo[pattern] = (match, offset, idx.length, idx.content_end)
+        return match, offset
@@ -0,0 +1,96 @@
+"""
+Header scoring for table candidates.
+
+A candidate table's score is the number of ``TABLE_CONFIG['expected_headers']``
+that occur in one of its header cells. ``HeaderIndex`` is built once per
+processor: the expected headers are lower-cased and counted up front, and a
+header row is scored by searching its cells joined into one string (cells
+never contain the separator, so no match spans two cells). Scores are
+memoized per header row, since the same header repeats on every page of a
+table and in every document of a layout.
+
+``best_table`` picks the winning candidate of a page from the header rows
+alone: a table's data rows are only counted, up to the minimum needed, and
+only for a table that would beat the current best score. The caller builds
+the rows of the final winner once.
+"""
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+_SEP = "\n"  # normalized header cells have no line breaks
+_MEMO_SIZE = 4096
+
+
+def first_filled_row(table: Sequence[Sequence[Any]], start: int = 0) -> Optional[int]:
+    """Index of the first row at or after ``start`` with a non-blank cell."""
+    for r_idx in range(start, len(table)):
+        row = table[r_idx]
+        if row and any(cell and str(cell).strip() for cell in row):
+            return r_idx
+    return None
+
+
+def _has_rows(table: Sequence[Sequence[Any]], start: int, need: int) -> bool:
+    """True if ``table`` has at least ``need`` non-blank rows from ``start`` on."""
+    found = 0
+    r_idx = first_filled_row(table, start)
+    while r_idx is not None and found < need:
+        found += 1
+        r_idx = first_filled_row(table, r_idx + 1)
+    return found >= need
+
+
+class HeaderIndex:
+    def __init__(self, expected_headers: Sequence[str]):
+        """Index ``expected_headers`` (matched case-insensitively, as substrings of a header cell)."""
+        counts = Counter(h.strip().lower() for h in expected_headers)
+        self.any_cell = counts.pop("", 0)  # an empty expected header matches any header cell
+        self.expected: List[Tuple[str, int]] = list(counts.items())
+        self._memo: Dict[Tuple[str, ...], int] = {}
+
+    def score(self, headers: Sequence[str]) -> int:
+        """How many expected headers occur in some cell of ``headers``."""
+        key = tuple(headers)
+        score = self._memo.get(key)
+        if score is None:
+            joined = _SEP.join(headers).lower()
+            score = sum(n for exp, n in self.expected if exp in joined)
+            if headers and self.any_cell:
+                score += self.any_cell
+            if len(self._memo) >= _MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = score
+        return score
+
+    def best_table(
+        self,
+        tables: Sequence[Sequence[Sequence[Any]]],
+        normalize: Callable[[Any], str],
+        floor: int = -1,
+        skip: Optional[int] = None,
+        min_cols: int = 5,
+        min_rows: int = 2,
+    ) -> Optional[Tuple[int, int, List[str], int]]:
+        """The candidate in ``tables`` with the highest score above ``floor``.
+
+        A candidate's header row is its first non-blank row, with cells passed
+        through ``normalize``. Candidates with fewer than ``min_cols`` columns
+        or ``min_rows`` data rows are ignored, as is ``tables[skip]``. Returns
+        ``(table_idx, header_row_idx, headers, score)``; ties keep the
+        earlier table.
+        """
+        best = None
+        for t_idx, table in enumerate(tables):
+            if t_idx == skip or not table:
+                continue
+            r_idx = first_filled_row(table)
+            if r_idx is None:
+                continue
+            headers = [normalize(cell) for cell in table[r_idx]]
+            if len(headers) < min_cols:
+                continue
+            score = self.score(headers)
+            if score <= floor or not _has_rows(table, r_idx + 1, min_rows):
+                continue
+            best, floor = (t_idx, r_idx, headers, score), score
+        return best
@@ -0,0 +1,130 @@
+"""
+Column-oriented storage for extracted line items.
+
+An ItemTable keeps the header names once and one list per column, instead of
+a dict per row that repeats every header key. Extraction appends rows to it,
+and save_results/the writers read rows straight back out without converting
+through dicts. Money and quantity columns are typed in bulk with pandas by
+``convert_numeric_columns``.
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Accepts 1234.5, 1,234.50, $1,234.50, -$5, $-5, (5.00), 5.00-, 5.00 CR
+_NUMBER_RE = (
+    r"^(?P<lparen>\()?\s*(?P<sign>[-+])?\s*\$?\s*(?P<sign2>[-+])?\s*"
+    r"(?P<num>\d{1,3}(?:,\d{3})+(?:\.\d*)?|\d+(?:\.\d*)?|\.\d+)"
+    r"\s*(?P<rparen>\))?\s*(?P<trail>-|CR)?$"
+)
+
+
+class ItemTable:
+    def __init__(
+        self,
+        headers: Sequence[str],
+        columns: Optional[List[List[Any]]] = None,
+        types: Optional[Dict[str, type]] = None,
+    ):
+        """Create a table with ``headers``; ``columns`` must line up with them if given.
+
+        ``types`` optionally records the python type of typed columns by header name.
+        """
+        self.headers: List[str] = list(headers)
+        self.columns: List[List[Any]] = columns if columns is not None else [[] for _ in self.headers]
+        if len(self.columns) != len(self.headers):
+            raise ValueError(f"ItemTable: {len(self.columns)} columns for {len(self.headers)} headers")
+        self.types: Dict[str, type] = dict(types or {})
+
+    @classmethod
+    def from_rows(cls, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> "ItemTable":
+        """Build a table from row sequences already padded to ``len(headers)``."""
+        table = cls(headers)
+        table.extend(rows)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __repr__(self) -> str:
+        return f"ItemTable(cols={len(self.headers)}, rows={len(self)})"
+
+    def append(self, values: Sequence[Any]) -> None:
+        """Append one row; ``values`` must have one entry per header."""
+        for column, value in zip(self.columns, values):
+            column.append(value)
+
+    def extend(self, rows: Iterable[Sequence[Any]]) -> None:
+        for values in rows:
+            self.append(values)
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over rows as tuples in header order."""
+        return zip(*self.columns)
+
+    def column(self, name: str) -> List[Any]:
+        """Values of the first column named ``name``."""
+        return self.columns[self.headers.index(name)]
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Rows as dicts keyed by header, for callers that want the old shape."""
+        return [dict(zip(self.headers, row)) for row in self.rows()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (used by the result cache)."""
+        return {
+            "headers": self.headers,
+            "columns": self.columns,
+            "types": {name: t.__name__ for name, t in self.types.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ItemTable":
+        type_names = {"int": int, "float": float, "str": str}
+        types = {name: type_names[t] for name, t in (data.get("types") or {}).items() if t in type_names}
+        return cls(data.get("headers", []), data.get("columns"), types)
+
+
+def convert_numeric_columns(table: ItemTable, spec: Dict[str, type]) -> List[Dict[str, Any]]:
+    """Convert the columns named in ``spec`` to int/float in place, one column at a time.
+
+    ``spec`` maps a header name (matched case-insensitively as a substring of
+    the table header, like header scoring) to ``int`` or ``float``. Currency
+    signs, thousands separators and negatives written as ``-5``, ``(5)``,
+    ``5-`` or ``5 CR`` are understood. Blank cells become None. Cells that do
+    not parse, or int cells with a fraction, also become None and are returned
+    as rejects: ``{"row": 1-based row, "column": header, "value": original}``.
+    """
+    rejects: List[Dict[str, Any]] = []
+    if not len(table):
+        return rejects
+    lowered = [h.lower() for h in table.headers]
+    for name, kind in spec.items():
+        col_idx = next((i for i, h in enumerate(lowered) if name.lower() in h), None)
+        if col_idx is None or kind not in (int, float):
+            continue
+        header = table.headers[col_idx]
+        raw = pd.Series(table.columns[col_idx], dtype="string").str.strip()
+        blank = raw.isna() | (raw == "")
+        parts = raw.str.extract(_NUMBER_RE, flags=re.IGNORECASE)
+        valid = parts["num"].notna() & (parts["lparen"].isna() == parts["rparen"].isna())
+        values = pd.to_numeric(parts["num"].str.replace(",", "", regex=False), errors="coerce")
+        negative = (
+            parts["lparen"].notna()
+            | (parts["sign"] == "-").fillna(False)
+            | (parts["sign2"] == "-").fillna(False)
+            | parts["trail"].notna()
+        )
+        values = values.where(~negative, -values)
+        if kind is int:
+            valid &= (values % 1 == 0).fillna(False)
+        bad = ~blank & ~valid
+        for row_idx in bad[bad].index:
+            rejects.append({"row": int(row_idx) + 1, "column": header, "value": table.columns[col_idx][row_idx]})
+        values = values.where(valid)
+        if kind is int:
+            values = values.astype("Int64")
+        table.columns[col_idx] = values.astype(object).where(valid, None).tolist()
+        table.types[header] = kind
+    return rejects
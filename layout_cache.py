@@ -0,0 +1,74 @@
+"""
+Learned table geometry per invoice layout.
+
+Invoices come in a few stable layouts. A layout is fingerprinted from the
+page size, the text of the items-table header line and the table config.
+After the full detection-and-scoring search picks a table, its column
+x-edges, bounding box and header are stored under that fingerprint. Later
+documents with the same fingerprint crop the header page below the header
+text and run table detection with those x-edges as explicit vertical lines,
+instead of searching and scoring every table on every page. Entries are kept
+in one small JSON file so worker processes and later runs share them.
+"""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from result_cache import fingerprint
+
+
+def layout_key(width: float, height: float, header_line: str, table_config: Dict[str, Any]) -> str:
+    """Fingerprint of a layout: page size, normalized header line text and table config."""
+    header = re.sub(r"\s+", " ", header_line).strip().lower()
+    return fingerprint([round(width), round(height), header, table_config])
+
+
+class LayoutCache:
+    def __init__(self, path: Optional[Path] = None):
+        """Layouts learned so far; persisted to ``path`` (JSON) if given."""
+        self.path = Path(path) if path else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._mtime: Optional[float] = None
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            mtime = self.path.stat().st_mtime
+            if mtime == self._mtime:
+                return
+            self.entries.update(json.loads(self.path.read_text(encoding="utf-8")))
+            self._mtime = mtime
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if key not in self.entries:
+            self._load()  # another process may have learned it since
+        return self.entries.get(key)
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Remember ``entry`` for ``key`` and merge it into the file."""
+        self._load()
+        self.entries[key] = entry
+        self._save()
+
+    def discard(self, key: str) -> None:
+        """Forget a layout whose cached geometry no longer matched a document."""
+        if self.entries.pop(key, None) is not None:
+            self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.entries), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._mtime = self.path.stat().st_mtime
+        except OSError:
+            pass
@@ -0,0 +1,107 @@
+"""
+Per-document, per-stage timing for the extraction pipeline.
+
+Stages nest (e.g. page text extracted during the anchor search); time is
+charged exclusively to the innermost running stage, so a document's stage
+timings add up to its total. Records can be written as JSON lines and
+summarized as a table of stage totals and the slowest documents.
+"""
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Display order for the summary table; unknown stages are appended
+STAGES = ["open", "fast_text", "page_text", "region_text", "fields", "anchor", "table_detect", "scoring", "fallback", "typing", "write"]
+
+
+class DocumentMetrics:
+    def __init__(self, name: str):
+        """Start collecting metrics for the document ``name``."""
+        self.name = name
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, Any] = {}
+        self._stack: List[List[Any]] = []  # [stage, started]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.stages[parent[0]] = self.stages.get(parent[0], 0.0) + now - parent[1]
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, started = self._stack.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + now - started
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def count(self, name: str, value: Any) -> None:
+        self.counts[name] = value
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "file": self.name,
+            "total_s": round(self.total, 6),
+            "stages_s": {k: round(v, 6) for k, v in self.stages.items()},
+            **self.counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentMetrics":
+        metrics = cls(data.get("file", ""))
+        metrics.stages = dict(data.get("stages_s", {}))
+        metrics.counts = {k: v for k, v in data.items() if k not in ("file", "total_s", "stages_s")}
+        return metrics
+
+
+class MetricsRecorder:
+    def __init__(self, jsonl_path: Optional[Path] = None):
+        """Collect per-document metrics; append each record to ``jsonl_path`` if given."""
+        self.records: List[DocumentMetrics] = []
+        self._fh = None
+        if jsonl_path:
+            Path(jsonl_path).parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(jsonl_path, "a", encoding="utf-8")
+
+    def add(self, metrics: DocumentMetrics) -> None:
+        self.records.append(metrics)
+        if self._fh is not None:
+            self._fh.write(json.dumps(metrics.to_dict()) + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def summary(self, slowest: int = 5) -> str:
+        """Stage totals across all documents plus the slowest documents."""
+        if not self.records:
+            return "Timings: no documents processed."
+        totals: Dict[str, float] = {}
+        for rec in self.records:
+            for stage, secs in rec.stages.items():
+                totals[stage] = totals.get(stage, 0.0) + secs
+        order = [s for s in STAGES if s in totals] + sorted(s for s in totals if s not in STAGES)
+        grand = sum(totals.values()) or 1.0
+        lines = [f"Timings for {len(self.records)} documents:", f"  {'stage':<14}{'seconds':>10}{'share':>8}"]
+        for stage in order:
+            lines.append(f"  {stage:<14}{totals[stage]:>10.3f}{totals[stage] / grand:>8.1%}")
+        lines.append(f"  {'total':<14}{grand:>10.3f}")
+        lines.append("Slowest documents:")
+        for rec in sorted(self.records, key=lambda r: r.total, reverse=True)[:slowest]:
+            top = max(rec.stages.items(), key=lambda kv: kv[1])[0] if rec.stages else "-"
+            lines.append(
+                f"  {rec.name:<40.40}{rec.total:>9.3f}s  pages={rec.counts.get('pages', '-')}"
+                f" rows={rec.counts.get('rows', '-')} slowest stage={top}"
+            )
+        return "\n".join(lines)
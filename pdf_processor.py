@@ -1,141 +1,376 @@
+import io
 import os
 import re
 import json
+import argparse
+import logging
+import cProfile
+import gc
+import pstats
+import tracemalloc
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import BinaryIO, Dict, Iterator, List, Any, Optional, Sequence, Tuple, Union
 import pdfplumber
 import pandas as pd
 from config import PDF_FIELDS, TABLE_CONFIG, PDF_SETTINGS
+from dedup import InvoiceRegistry, find_duplicates
+from fallback_table import header_spans, table_from_fixed_width, table_from_split_rows, table_from_words
+from field_plan import FieldExtractionPlan
+from header_index import HeaderIndex, first_filled_row
+from item_table import ItemTable, convert_numeric_columns
+from layout_cache import LayoutCache, layout_key
+from metrics import DocumentMetrics, MetricsRecorder
+from result_cache import ResultCache, file_digest
+from writers import EXCEL, open_items_writers, parse_formats
+
+logger = logging.getLogger(__name__)
+
+
+def _fast_reader_class():
+    """``PdfReader`` from pypdf, or PyPDF2 for older installs; None if neither is installed."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        try:
+            from PyPDF2 import PdfReader
+        except ImportError:
+            logger.warning("text_engine 'pypdf' needs pypdf or PyPDF2; using pdfplumber text")
+            return None
+    return PdfReader
+
+
+def _rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Current resident set size of this process (or process ``pid``) in MB, or None if unavailable."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss / 2**20
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PDFDocument:
+    """Per-document parse context.
+
+    The PDF is opened once and each page's text and word objects are computed
+    at most once, then shared by field extraction, anchor search and table
+    detection. pdfplumber keeps the parsed layout on the page object, so
+    ``extract_tables()`` on a page whose text was already read reuses it.
+
+    Pages are handed out through ``page()``, which keeps the layout caches of
+    at most ``live_pages`` recently used pages and closes the rest, so memory
+    does not grow with page count. If ``memory_limit_mb`` is set and the
+    process RSS goes above it, every other live page is released and
+    pdfminer's object cache is cleared as well. RSS rarely drops after a
+    release, so the check is skipped until ``live_pages`` new pages have been
+    opened since the last one.
+
+    With ``text_engine="pypdf"``, ``scan_text()`` reads plain page text with
+    pypdf/PyPDF2 instead of pdfplumber, for searches that do not need layout
+    (fields, the anchor page, the table pre-scan).
+
+    ``pdf_path`` may also be the PDF's bytes or a binary file object, which is
+    read to the end once; ``name`` then labels the document in logs and
+    metrics (default: the file object's name, else ``<memory>``).
+    """
+
+    def __init__(self, pdf_path: Union[Path, str, bytes, BinaryIO], live_pages: Optional[int] = 8,
+                 memory_limit_mb: Optional[float] = None, text_engine: str = "pdfplumber", name: Optional[str] = None):
+        self._data: Optional[bytes] = None  # the PDF itself when it was not given as a path
+        if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+            self._data = bytes(pdf_path)
+        elif hasattr(pdf_path, "read"):
+            self._data = pdf_path.read()
+            name = name or Path(str(getattr(pdf_path, "name", "") or "<memory>")).name
+        self.path = Path(name or "<memory>") if self._data is not None else Path(pdf_path)
+        self._pdf = None
+        self._reader = None
+        self._texts: Dict[int, str] = {}
+        self._scan_texts: Dict[int, str] = {}
+        if text_engine == "pypdf" and _fast_reader_class() is None:
+            text_engine = "pdfplumber"
+        self.text_engine = text_engine
+        self._words: Dict[int, List[Dict[str, Any]]] = {}
+        self.live_pages = max(1, int(live_pages)) if live_pages else None  # None: keep every page
+        self.memory_limit_mb = memory_limit_mb
+        self._live: "OrderedDict[int, Any]" = OrderedDict()  # page index -> page, least recent first
+        self._opened_since_release: Optional[int] = None  # pages opened since the last release (None: none yet)
+        self.text_pages_read = 0  # pages handed out by iter_text so far
+        # Stage timings and counters filled in by the extraction stages
+        self.metrics = DocumentMetrics(self.path.name)
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._live.clear()
+        self._reader = None
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    @property
+    def pdf(self):
+        # Opened lazily so open errors surface in the stage that needs the file
+        if self._pdf is None:
+            with self.metrics.stage("open"):
+                self._pdf = pdfplumber.open(self._source())
+        return self._pdf
+
+    @property
+    def pages(self):
+        return self.pdf.pages
+
+    @property
+    def reader(self):
+        """pypdf/PyPDF2 reader over the same file, opened on first use."""
+        if self._reader is None:
+            with self.metrics.stage("open"):
+                self._reader = _fast_reader_class()(self._source())
+        return self._reader
+
+    @property
+    def on_disk(self) -> bool:
+        """True if the document was opened from a path other processes can open too."""
+        return self._data is None
+
+    def _source(self):
+        # Each reader gets its own stream; they seek independently
+        return io.BytesIO(self._data) if self._data is not None else str(self.path)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def page(self, page_idx: int):
+        """pdfplumber page ``page_idx`` (0-based), releasing the least recently used live pages."""
+        page = self.pages[page_idx]
+        if page_idx not in self._live and self._opened_since_release is not None:
+            self._opened_since_release += 1
+        self._live[page_idx] = page
+        self._live.move_to_end(page_idx)
+        while self.live_pages and len(self._live) > self.live_pages:
+            old_idx, old_page = self._live.popitem(last=False)
+            old_page.close()
+            self._words.pop(old_idx, None)  # word objects are as large as the layout; they go with it
+        cooled_down = self._opened_since_release is None or self._opened_since_release >= (self.live_pages or 8)
+        if self.memory_limit_mb and cooled_down and (_rss_mb() or 0) > self.memory_limit_mb:
+            self.release(keep=page_idx)
+        return page
+
+    def region_text(self, page_idx: int, bbox: Sequence[float]) -> str:
+        """Text inside ``bbox`` (x0, top, x1, bottom in points) of one page, clipped to the page."""
+        if not 0 <= page_idx < self.page_count:
+            return ""
+        page = self.page(page_idx)
+        x0, top, x1, bottom = bbox
+        x0, top, x1, bottom = max(0.0, x0), max(0.0, top), min(float(page.width), x1), min(float(page.height), bottom)
+        if x0 >= x1 or top >= bottom:
+            return ""
+        with self.metrics.stage("region_text"):
+            return page.crop((x0, top, x1, bottom)).extract_text() or ""
+
+    def iter_text(self, fast: bool = False) -> Iterator[str]:
+        """Yield page texts in order, extracting each only when it is consumed (``fast``: ``scan_text``)."""
+        for page_idx in range(self.page_count):
+            self.text_pages_read = max(self.text_pages_read, page_idx + 1)
+            try:
+                yield self.scan_text(page_idx) if fast else self.page_text(page_idx)
+            except Exception as e:
+                logger.error("Error extracting text from %s page %d: %s", self.path.name, page_idx + 1, e)
+                yield ""
+
+    def release(self, keep: Optional[int] = None) -> None:
+        """Drop parsed layout of all live pages except ``keep`` and pdfminer's cached objects."""
+        for page_idx in [i for i in self._live if i != keep]:
+            self._live.pop(page_idx).close()
+        self._words.clear()
+        cached_objs = getattr(getattr(self._pdf, "doc", None), "_cached_objs", None)
+        if cached_objs is not None:
+            cached_objs.clear()
+        gc.collect()
+        self._opened_since_release = 0
+        self.metrics.count("memory_releases", self.metrics.counts.get("memory_releases", 0) + 1)
+
+    def page_text(self, page_idx: int) -> str:
+        """Text of one page (0-based), extracted on first use."""
+        if page_idx not in self._texts:
+            with self.metrics.stage("page_text"):
+                self._texts[page_idx] = self.page(page_idx).extract_text() or ""
+        return self._texts[page_idx]
+
+    def page_words(self, page_idx: int) -> List[Dict[str, Any]]:
+        """Word objects of one page (0-based), extracted on first use."""
+        if page_idx not in self._words:
+            with self.metrics.stage("page_words"):
+                self._words[page_idx] = self.page(page_idx).extract_words()
+        return self._words[page_idx]
+
+    def scan_text(self, page_idx: int) -> str:
+        """Plain text of one page for searching: pypdf text in the fast tier, else ``page_text``."""
+        if self.text_engine != "pypdf":
+            return self.page_text(page_idx)
+        if page_idx not in self._scan_texts:
+            with self.metrics.stage("fast_text"):
+                try:
+                    self._scan_texts[page_idx] = self.reader.pages[page_idx].extract_text() or ""
+                except Exception as e:
+                    logger.debug("%s: fast text failed on page %d (%s); using pdfplumber", self.path.name, page_idx + 1, e)
+                    self._scan_texts[page_idx] = self.page_text(page_idx)
+        return self._scan_texts[page_idx]
+
+    @property
+    def text(self) -> str:
+        """All page texts joined, one trailing newline per page."""
+        return "".join(self.page_text(i) + "\n" for i in range(self.page_count))
+
+    @property
+    def scan_text_all(self) -> str:
+        """All ``scan_text`` pages joined like ``text``."""
+        return "".join(self.scan_text(i) + "\n" for i in range(self.page_count))
+
+    def find_page_ci(self, needle: str, start: int = 0) -> Optional[int]:
+        """Like ``find_page``, ignoring case."""
+        needle = needle.lower()
+        for p_idx in range(start, self.page_count):
+            try:
+                if needle in self.scan_text(p_idx).lower():
+                    return p_idx
+            except Exception:
+                continue
+        return None
+
+    def find_page(self, needle: str, start: int = 0) -> Optional[int]:
+        """Index of the first page at or after ``start`` whose text contains ``needle``."""
+        for p_idx in range(start, self.page_count):
+            try:
+                p_text = self.scan_text(p_idx)
+            except Exception:
+                p_text = ""
+            if needle in p_text:
+                return p_idx
+        return None
+
+
+# A table found on a page: extracted cells, sorted column x-edges, bounding box
+TableFragment = Tuple[List[List[Any]], List[float], Tuple[float, float, float, float]]
+
+
+def _column_edges(table) -> List[float]:
+    return sorted({round(x, 1) for cell in table.cells for x in (cell[0], cell[2])})
+
+
+def _may_hold_header(doc: PDFDocument, page_idx: int, expected_tokens: List[set], min_hits: int) -> bool:
+    """Pre-scan: does the page text contain at least ``min_hits`` expected-header words?"""
+    try:
+        words = set(re.findall(r"\w+", doc.scan_text(page_idx).lower()))
+    except Exception:
+        return True  # let table detection decide
+    return sum(1 for toks in expected_tokens if toks and toks <= words) >= min_hits
+
+
+def _page_tables(
+    doc: PDFDocument,
+    page_indices: Sequence[int],
+    prescan: Optional[Tuple[List[set], int]] = None,
+    analyze_first: bool = False,
+) -> Iterator[Tuple[int, Optional[bool], Optional[List[TableFragment]]]]:
+    """Detect the tables of each page in ``page_indices``; yields ``(page_idx, may_hold_header, tables)``.
+
+    With ``prescan`` (expected-header token sets, minimum hits), a page is only
+    analyzed if its text passes the pre-scan or the previous page had a table;
+    skipped pages yield ``tables=None``. ``may_hold_header`` is None where the
+    pre-scan was not needed. ``analyze_first`` also analyzes the first page,
+    for a slice whose previous page is handled by another worker. The parent
+    then replays the slice and may skip that first page, so its view of
+    "previous page had a table" can differ from this one: every page of such
+    a slice gets its pre-scan result.
+    """
+    prev_had_table = False
+    for n, page_idx in enumerate(page_indices):
+        may_hold = None
+        if prescan is not None and (analyze_first or not prev_had_table):
+            may_hold = _may_hold_header(doc, page_idx, *prescan)
+            if not may_hold and not prev_had_table and not (analyze_first and n == 0):
+                yield page_idx, may_hold, None
+                continue
+        with doc.metrics.stage("table_detect"):
+            found = doc.page(page_idx).find_tables()
+            tables = [(t.extract(), _column_edges(t), tuple(t.bbox)) for t in found]
+        prev_had_table = any(cells and len(cells[0] or []) >= 5 for cells, _, _ in tables)
+        yield page_idx, may_hold, tables
+
 
 class PDFProcessor:
     def __init__(self, config: Dict[str, Any]):
         """Initialize the PDF processor with configuration."""
         self.config = config
         self.input_dir = Path(config["input_dir"])
-        self.output_dir = Path(config["output_dir"])
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir = Path(config["output_dir"])  # created when a batch run first writes to it
+        # Field patterns are compiled once per processor, not per document
+        self.field_plan = FieldExtractionPlan(PDF_FIELDS)
+        self.header_index = HeaderIndex(TABLE_CONFIG.get("expected_headers", []))
+        # Table geometry learned per invoice layout, shared through a JSON file;
+        # like the result cache, it is off when use_cache is
+        self.layout_cache = None
+        if config.get("layout_cache", True) and config.get("use_cache", True):
+            layout_path = config.get("layout_cache_file") or Path(config.get("cache_dir") or self.output_dir / ".cache") / "layouts.json"
+            self.layout_cache = LayoutCache(None if config.get("layout_cache") == "memory" else layout_path)
 
-    def extract_text_from_pdf(self, pdf_path: Path) -> str:
-        """Extract all text from a PDF file."""
+    def open_document(self, pdf_path: Union[Path, str, bytes, BinaryIO], name: Optional[str] = None) -> PDFDocument:
+        """Return a parse context for ``pdf_path`` (a path, bytes or binary file); use it as a context manager."""
+        return PDFDocument(
+            pdf_path,
+            live_pages=self.config.get("live_pages", 8),
+            memory_limit_mb=self.config.get("memory_limit_mb"),
+            text_engine=self.config.get("text_engine", "pdfplumber"),
+            name=name,
+        )
+
+    def extract_text_from_pdf(self, source: Union[Path, PDFDocument]) -> str:
+        """Extract all text from a PDF file or an already open document."""
+        doc = source if isinstance(source, PDFDocument) else self.open_document(source)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-            return text
+            return doc.text
         except Exception as e:
-            print(f"Error extracting text from {pdf_path.name}: {str(e)}")
+            logger.error("Error extracting text from %s: %s", doc.path.name, e)
             return ""
+        finally:
+            if doc is not source:
+                doc.close()
 
     def extract_field_value(self, text: str, field_config: Dict[str, Any]) -> Any:
         """Extract a single field value from the text using regex or exact/variant labels.
-        Supports:
-        - field_config["label"]: single label
-        - field_config["labels"]: list of alternative labels
-        - field_config["group"]: regex capture group index when using regex (default 0)
+
+        ``field_config`` takes the keys of a PDF_FIELDS entry; the value is
+        resolved the way ``process_pdf`` resolves all fields, by a
+        ``FieldExtractionPlan`` (here one built for this field alone).
         """
-        label = field_config.get("label", "")
-        labels = field_config.get("labels", ([label] if label else []))
-        field_type = field_config.get("type", str)
-        is_regex = field_config.get("is_regex", False)
-        regex_group = int(field_config.get("group", 0))
-        value_regex = field_config.get("value_regex")  # optional regex to locate value near label
-        
-        try:
-            if is_regex:
-                pattern = label
-                match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    try:
-                        value = match.group(regex_group).strip()
-                    except IndexError:
-                        value = match.group(0).strip()
-                    print(f"Found (regex) {pattern}: {value}")
-                    return value
-                print(f"Warning: Could not match regex for {pattern}")
-                return ""
-            else:
-                # Try each provided label variant
-                label_variants = [lv for lv in labels if lv]
-                if not label_variants and label:
-                    label_variants = [label]
-                
-                for lbl in label_variants:
-                    patterns = [
-                        re.escape(lbl) + r"\s*[:\-]?\s*(.+?)(?:\n|$)",  # Label: Value
-                        re.escape(lbl) + r"\s+(\S+)",                      # Label Value
-                        re.escape(lbl) + r"\s*\n\s*(\S+)"                 # Label\nValue
-                    ]
-                    for pattern in patterns:
-                        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-                        if match:
-                            value = match.group(1).strip()
-                            # If a value_regex is provided, ensure the value matches; otherwise keep searching
-                            if value_regex and not re.search(value_regex, value, re.IGNORECASE):
-                                # Not acceptable, continue trying other patterns or fall back to window scan
-                                continue
-                            print(f"Found {lbl}: {value}")
-                            try:
-                                if field_type == int:
-                                    value = re.sub(r"[^0-9.-]", "", value)
-                                    return int(float(value)) if value else None
-                                if field_type == float:
-                                    value = re.sub(r"[^0-9.-]", "", value)
-                                    return float(value) if value else None
-                                return value
-                            except (ValueError, TypeError):
-                                return value
-                    # If direct patterns failed, try scanning nearby lines after the label
-                    # Find the first occurrence of the label and look ahead a few lines
-                    lines = text.splitlines()
-                    lbl_lower = lbl.lower()
-                    for idx, line in enumerate(lines):
-                        if lbl_lower in line.lower():
-                            window_text = "\n".join(lines[idx + 1: idx + 8])  # look ahead up to 7 lines
-                            # If a value_regex is provided, use it to find the value within the window
-                            if value_regex:
-                                m = re.search(value_regex, window_text, re.IGNORECASE)
-                                if m:
-                                    val = m.group(0).strip()
-                                    print(f"Found near '{lbl}' using value_regex: {val}")
-                                    try:
-                                        if field_type == int:
-                                            val = re.sub(r"[^0-9.-]", "", val)
-                                            return int(float(val)) if val else None
-                                        if field_type == float:
-                                            val = re.sub(r"[^0-9.-]", "", val)
-                                            return float(val) if val else None
-                                        return val
-                                    except (ValueError, TypeError):
-                                        return val
-                            # Otherwise, pick the first non-empty candidate line (apply value_regex if provided)
-                            for cand in lines[idx + 1: idx + 8]:
-                                cand = cand.strip()
-                                if not cand:
-                                    continue
-                                if value_regex and not re.search(value_regex, cand, re.IGNORECASE):
-                                    continue
-                                print(f"Heuristic pick near '{lbl}': {cand}")
-                                try:
-                                    if field_type == int:
-                                        cand_n = re.sub(r"[^0-9.-]", "", cand)
-                                        return int(float(cand_n)) if cand_n else None
-                                    if field_type == float:
-                                        cand_n = re.sub(r"[^0-9.-]", "", cand)
-                                        return float(cand_n) if cand_n else None
-                                    return cand
-                                except (ValueError, TypeError):
-                                    return cand
-                            break
-                print(f"Warning: Could not find value for any of labels: {label_variants}")
-                return ""
-        except Exception as e:
-            print(f"Error extracting field with labels {labels or label}: {str(e)}")
-            return ""
+        return FieldExtractionPlan({"value": field_config}).extract(text)["value"]
+
+    def extract_table_data(self, text: str) -> ItemTable:
+        """Extract table data from the text using case-insensitive markers and configured headers if provided.
 
-    def extract_table_data(self, text: str) -> List[Dict[str, Any]]:
-        """Extract table data from the text using case-insensitive markers and configured headers if provided."""
-        table_data: List[Dict[str, Any]] = []
+        Column boundaries come from the header line's character offsets and all
+        data lines are sliced at once, so columns must be aligned (layout text).
+        If the header line does not have one label per configured header, each
+        line is split on runs of spaces instead.
+        """
+        table_data = ItemTable([])
         lines = [line for line in text.split('\n')]  # Keep empty lines for better parsing
         lower_lines = [line.lower() for line in lines]
         start_marker = (TABLE_CONFIG.get("table_start") or "").lower()
@@ -146,70 +381,97 @@ class PDFProcessor:
         for i, (line, ll) in enumerate(zip(lines, lower_lines)):
             if start_marker and start_marker in ll:
                 start_index = i
-                print(f"Detected table start at line {i}: {line}")
+                logger.debug("Detected table start at line %d: %s", i, line)
                 break
         
         if start_index == -1:
-            print(f"Warning: Could not find table start marker '{TABLE_CONFIG.get('table_start')}'")
+            logger.warning("Could not find table start marker '%s'", TABLE_CONFIG.get('table_start'))
             return table_data
         
-        # Determine headers
+        # Determine headers and their character spans
         headers_cfg = TABLE_CONFIG.get("table_headers") or []
         headers: List[str] = []
+        spans = header_spans(lines[start_index])
+        data_start = start_index + 1
         if headers_cfg:
             headers = headers_cfg
-            # Assume the header row is right at or after start_index; advance one line for data start
-            data_start = start_index + 1
         else:
             # Try to infer headers from the next few non-empty lines (allow extra spacing above headers)
-            data_start = start_index + 1
             for i in range(start_index, min(start_index + 15, len(lines))):
-                row = lines[i].strip()
-                if not row:
+                if not lines[i].strip():
                     continue
-                potential_headers = [h.strip() for h in re.split(r'\s{2,}', row) if h.strip()]
-                if len(potential_headers) >= 3:
-                    headers = potential_headers
+                spans = header_spans(lines[i])
+                if len(spans) >= 3:
+                    headers = [label for label, _, _ in spans]
                     data_start = i + 1
                     break
         
         if not headers:
-            print("Warning: Could not determine table headers")
+            logger.warning("Could not determine table headers")
             return table_data
+        aligned = len(spans) == len(headers)
+        if not aligned:
+            logger.debug("Header line has %d labels for %d configured headers; splitting rows on spaces",
+                         len(spans), len(headers))
         
-        print(f"Using table headers: {headers}")
+        logger.debug("Using table headers: %s", headers)
         
-        # Extract data rows until end marker (case-insensitive)
-        for raw_line, ll in zip(lines[data_start:], lower_lines[data_start:]):
-            if end_marker and end_marker in ll:
-                print(f"Detected table end at line: {raw_line}")
+        # Data rows run until the end marker (case-insensitive)
+        data_end = len(lines)
+        for i in range(data_start, len(lines)):
+            if end_marker and end_marker in lower_lines[i]:
+                logger.debug("Detected table end at line: %s", lines[i])
+                data_end = i
                 break
-            line = raw_line.strip()
-            if not line or len(line.split()) < 2:
-                continue
-            values = [v.strip() for v in re.split(r'\s{2,}', line) if v.strip()]
-            if not values:
-                continue
-            # Pad/truncate to match headers length
-            if len(values) < len(headers):
-                values = values + [''] * (len(headers) - len(values))
-            elif len(values) > len(headers):
-                values = values[:len(headers)]
-            row_dict = dict(zip(headers, values))
-            table_data.append(row_dict)
+        data_lines = [line for line in lines[data_start:data_end] if len(line.split()) >= 2]
+        if aligned:
+            table_data = table_from_fixed_width(data_lines, spans, headers)
+        else:
+            table_data = table_from_split_rows(data_lines, headers)
         
-        print(f"Extracted {len(table_data)} rows from table")
+        logger.debug("Extracted %d rows from table", len(table_data))
         return table_data
 
-    def extract_table_data_plumber(self, pdf_path: Path, anchor_after_text: Optional[str] = None) -> List[Dict[str, Any]]:
+    def extract_table_data_words(self, source: Union[Path, PDFDocument], anchor_after_text: Optional[str] = None) -> ItemTable:
+        """Extract the items table from pdfplumber word positions when no ruled table is found.
+
+        Column boundaries are taken from the x-positions of the header row
+        (the line containing TABLE_CONFIG['table_start']) on the first page at
+        or after ``anchor_after_text``; data lines follow on later pages.
+        """
+        doc = source if isinstance(source, PDFDocument) else self.open_document(source)
+        try:
+            start_page_idx = (doc.find_page(anchor_after_text) or 0) if anchor_after_text else 0
+            pages = ((idx, doc.page_words(idx)) for idx in range(start_page_idx, doc.page_count))
+            table_data = table_from_words(
+                pages,
+                TABLE_CONFIG.get("table_start") or "",
+                TABLE_CONFIG.get("table_end") or "",
+                min_cells=TABLE_CONFIG.get("fallback_min_cells"),
+                word_gap=TABLE_CONFIG.get("fallback_word_gap"),
+            )
+            if table_data.headers:
+                logger.debug("Word-position fallback: %d rows; headers: %s", len(table_data), table_data.headers)
+            return table_data
+        except Exception as e:
+            logger.warning("Word-position table extraction error: %s", e)
+            return ItemTable([])
+        finally:
+            if doc is not source:
+                doc.close()
+
+    def extract_table_data_plumber(self, source: Union[Path, PDFDocument], anchor_after_text: Optional[str] = None) -> ItemTable:
         """Extract table data using pdfplumber's table detection.
         Strategy:
         - Normalize header cells (collapse whitespace/newlines).
         - Score each table by overlap with TABLE_CONFIG['expected_headers'].
         - Pick best scoring table above TABLE_CONFIG['min_header_matches'].
+        - Append continuation tables from the following pages whose column geometry
+          matches the picked table, dropping a repeated header row.
         - If anchor_after_text is provided, only consider tables on or after the page containing that text.
+        Pass an open PDFDocument to reuse page text already extracted for fields.
         """
-        results: List[Dict[str, Any]] = []
+        results = ItemTable([])
         expected = [h.strip().lower() for h in TABLE_CONFIG.get('expected_headers', [])]
         min_matches = int(TABLE_CONFIG.get('min_header_matches', max(1, len(expected)//3 or 1)))
 
@@ -225,210 +487,854 @@ class PDFProcessor:
             txt = txt.replace("PO O creation date", "PO creation date")
             return txt
 
-        def header_score(headers: List[str]) -> int:
-            h_low = [h.lower() for h in headers]
-            score = 0
-            for exp in expected:
-                if any(exp in h for h in h_low):
-                    score += 1
-            return score
+        def build_rows(table: List[List[Any]], start_row_idx: int, headers: List[str]) -> List[List[str]]:
+            rows: List[List[str]] = []
+            for row in table[start_row_idx:]:
+                if not row:
+                    continue
+                values = [ norm_cell(cell) for cell in row ]
+                if not any(values):
+                    continue
+                # Pad/truncate to headers
+                if len(values) < len(headers):
+                    values += [''] * (len(headers) - len(values))
+                elif len(values) > len(headers):
+                    values = values[:len(headers)]
+                rows.append(values)
+            return rows
+
+        # Multi-page tables: later pages continue the picked table when their
+        # column x-edges line up with it
+        stitch = bool(TABLE_CONFIG.get("stitch_pages", True))
+        x_tolerance = float(TABLE_CONFIG.get("stitch_x_tolerance", 3.0))
 
-        best = {"score": -1, "headers": None, "rows": None, "page": None}
+        def same_columns(edges: List[float], ref: Optional[List[float]]) -> bool:
+            if not ref or len(edges) != len(ref):
+                return False
+            return all(abs(a - b) <= x_tolerance for a, b in zip(edges, ref))
+
+        # Cheap pre-scan: only run table detection on pages whose text contains enough
+        # expected-header words, or that follow a page with a table (a continuation).
+        prescan = bool(TABLE_CONFIG.get("page_prescan", True)) and bool(expected)
+        prescan_min = int(TABLE_CONFIG.get("prescan_min_matches", max(1, min_matches // 2)))
+        prescan_spec = ([set(re.findall(r"\w+", exp)) for exp in expected], prescan_min) if prescan else None
+
+        # Known layout: read the table at the cached geometry instead of searching
+        table_start = TABLE_CONFIG.get("table_start") or ""
+
+        def ruled_rows(table, vertical_edges: List[Dict[str, Any]], edges: List[float]) -> Tuple[List[List[Any]], bool]:
+            """Rows of ``table`` ruled at every cached column edge, up to the first one that is not.
+
+            Unruled rows above the table are skipped. The flag is False if the
+            table ended on this page.
+            """
+            spans = [[(e["top"], e["bottom"]) for e in vertical_edges if abs(e["x0"] - x) <= x_tolerance] for x in edges]
+            rows: List[List[Any]] = []
+            for row, cells in zip(table.rows, table.extract()):
+                mid = (row.bbox[1] + row.bbox[3]) / 2
+                if not all(any(top <= mid <= bottom for top, bottom in col) for col in spans):
+                    if rows:
+                        return rows, False  # past the table: ruled content below it has other columns
+                    continue
+                rows.append(cells)
+            return rows, True
+
+        def read_layout(entry: Dict[str, Any], header_idx: int) -> Tuple[Optional[List[str]], List[List[str]], List[int]]:
+            edges = entry["edges"]
+            settings = {"vertical_strategy": "explicit", "explicit_vertical_lines": edges, "horizontal_strategy": "lines"}
+            headers: Optional[List[str]] = None
+            rows: List[List[str]] = []
+            pages: List[int] = []
+            for page_idx in range(header_idx, doc.page_count):
+                page = doc.page(page_idx)
+                top = 0.0
+                if page_idx == header_idx:
+                    hits = page.search(table_start, regex=False, case=False)
+                    if not hits:
+                        return None, [], []
+                    top = max(0.0, hits[0]["top"] - entry["header_offset"] - 1)
+                region = page.crop((max(0.0, edges[0] - 1), top, min(page.width, edges[-1] + 1), page.height))
+                found = region.find_tables(settings)
+                if not found:
+                    break
+                # Explicit vertical lines run to the bottom of the crop, so keep only
+                # rows the page itself rules at the cached edges
+                table, complete = ruled_rows(max(found, key=lambda t: len(t.rows)), region.vertical_edges, edges)
+                r_idx = first_filled_row(table)
+                if r_idx is None:
+                    break
+                if [norm_cell(c).lower() for c in table[r_idx]] == entry["header_key"]:
+                    if headers is None:
+                        headers = [norm_cell(c) for c in table[r_idx]]
+                    r_idx += 1
+                elif headers is None:
+                    return None, [], []  # the header row is not where this layout has it
+                rows.extend(build_rows(table, r_idx, headers))
+                pages.append(page_idx + 1)
+                if not stitch or not complete:
+                    break
+            return headers, rows, pages
+
+        best: Dict[str, Any] = {"score": -1, "headers": None, "fragments": [], "page": None}
+        doc = source if isinstance(source, PDFDocument) else self.open_document(source)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Determine start page based on anchor text (e.g., coupon description value)
-                start_page_idx = 0
-                if anchor_after_text:
-                    for p_idx, p in enumerate(pdf.pages):
-                        try:
-                            p_text = p.extract_text() or ""
-                        except Exception:
-                            p_text = ""
-                        if anchor_after_text in p_text:
-                            start_page_idx = p_idx
-                            break
-                if anchor_after_text:
-                    print(f"pdfplumber: limiting table search to pages >= {start_page_idx + 1} due to anchor text match")
-                for page_idx, page in enumerate(pdf.pages):
-                    if page_idx < start_page_idx:
-                        continue
-                    tables = page.extract_tables() or []
-                    for t_idx, table in enumerate(tables):
-                        if not table or not any(table):
-                            continue
-                        # Determine header row: first non-empty row
-                        header_row = None
-                        start_row_idx = 0
-                        for r_idx, row in enumerate(table):
-                            if row and any(cell and str(cell).strip() for cell in row):
-                                header_row = [ norm_cell(cell) for cell in row ]
-                                start_row_idx = r_idx + 1
+            # Determine start page based on anchor text (e.g., coupon description value)
+            start_page_idx = 0
+            if anchor_after_text:
+                with doc.metrics.stage("anchor"):
+                    start_page_idx = doc.find_page(anchor_after_text) or 0
+            if anchor_after_text:
+                logger.debug("pdfplumber: limiting table search to pages >= %d due to anchor text match", start_page_idx + 1)
+            if self.layout_cache is not None and table_start:
+                header_idx = doc.find_page_ci(table_start, start_page_idx)
+                key = self._layout_key(doc, header_idx) if header_idx is not None else None
+                entry = self.layout_cache.get(key) if key else None
+                if entry:
+                    with doc.metrics.stage("table_detect"):
+                        headers, rows, pages = read_layout(entry, header_idx)
+                    if headers and rows and self.header_index.score(headers) >= min_matches:
+                        doc.metrics.count("layout_cache", "hit")
+                        logger.debug("pdfplumber: cached layout read %d rows from pages %s", len(rows), pages)
+                        return ItemTable.from_rows(headers, rows)
+                    self.layout_cache.discard(key)
+                    doc.metrics.count("layout_cache", "stale")
+            pages = range(start_page_idx, doc.page_count)
+            # Page workers reopen the file by path, so in-memory documents stay serial
+            workers = self._page_workers(len(pages)) if doc.on_disk else 1
+            if workers > 1:
+                # Workers detect tables on page slices; scoring and stitching below
+                # replay them in page order exactly as the serial loop would
+                with doc.metrics.stage("table_detect"):
+                    page_results = self._parallel_page_tables(doc, pages, prescan_spec, workers)
+                doc.metrics.count("page_workers", workers)
+            else:
+                page_results = _page_tables(doc, pages, prescan_spec)
+            pages_analyzed = pages_skipped = 0
+            prev_had_table = False
+            chain_page = None  # last page stitched onto the current best table
+            for page_idx, may_hold, found in page_results:
+                if prescan and not prev_had_table and not may_hold:
+                    pages_skipped += 1
+                    continue
+                pages_analyzed += 1
+                tables = [cells for cells, _, _ in found]
+                prev_had_table = any(table and len(table[0] or []) >= 5 for table in tables)
+
+                with doc.metrics.stage("scoring"):
+                    # Continuation of the best table from the previous page: matched by
+                    # column geometry only, so fragments are never scored again.
+                    continued_idx = None
+                    if chain_page is not None and page_idx == chain_page + 1:
+                        for t_idx, (_, edges, _) in enumerate(found):
+                            if tables[t_idx] and same_columns(edges, best["edges"]):
+                                continued_idx = t_idx
+                                fragment = tables[t_idx]
+                                start_row_idx = first_filled_row(fragment)
+                                # Skip a repeated header row at the top of the continuation
+                                if start_row_idx is not None and [norm_cell(c).lower() for c in fragment[start_row_idx]] == best["header_key"]:
+                                    start_row_idx += 1
+                                best["fragments"].append((fragment, start_row_idx or 0))
+                                best["pages"].append(page_idx + 1)
+                                chain_page = page_idx
                                 break
-                        if not header_row:
-                            continue
-                        score = header_score(header_row)
-                        # Build rows for this candidate
-                        candidate_rows: List[Dict[str, Any]] = []
-                        headers = header_row
-                        for row in table[start_row_idx:]:
-                            if not row:
-                                continue
-                            values = [ norm_cell(cell) for cell in row ]
-                            if not any(values):
-                                continue
-                            # Pad/truncate to headers
-                            if len(values) < len(headers):
-                                values += [''] * (len(headers) - len(values))
-                            elif len(values) > len(headers):
-                                values = values[:len(headers)]
-                            candidate_rows.append(dict(zip(headers, values)))
-                        # Heuristics: require reasonable columns and at least 2 data rows
-                        if len(headers) < 5 or len(candidate_rows) < 2:
-                            continue
-                        if score > best["score"]:
-                            best = {
-                                "score": score,
-                                "headers": headers,
-                                "rows": candidate_rows,
-                                "page": page_idx + 1,
-                            }
-                if best["headers"] and best["score"] >= min_matches and best["rows"]:
-                    print(f"pdfplumber: picked table on page {best['page']} with score {best['score']} / {len(expected)}; cols={len(best['headers'])}, rows={len(best['rows'])}; headers: {best['headers']}")
-                    return best["rows"]
+                    if continued_idx is None:
+                        chain_page = None
+
+                    # Pick by header score first; data rows are built only for the final table
+                    pick = self.header_index.best_table(tables, norm_cell, floor=best["score"], skip=continued_idx)
+                    if pick is not None:
+                        t_idx, r_idx, headers, score = pick
+                        best = {
+                            "score": score,
+                            "headers": headers,
+                            "header_key": [h.lower() for h in headers],
+                            "fragments": [(tables[t_idx], r_idx + 1)],
+                            "page": page_idx + 1,
+                            "pages": [page_idx + 1],
+                            "edges": found[t_idx][1],
+                            "bbox": found[t_idx][2],
+                        }
+                        chain_page = page_idx if stitch else None
+            doc.metrics.count("pages_analyzed", pages_analyzed)
+            doc.metrics.count("pages_skipped", pages_skipped)
+            if prescan:
+                logger.debug("pdfplumber: pre-scan analyzed %d pages, skipped %d", pages_analyzed, pages_skipped)
+            if best["headers"] and best["score"] >= min_matches:
+                rows = [row for fragment, start in best["fragments"] for row in build_rows(fragment, start, best["headers"])]
+                logger.debug("pdfplumber: picked table on page %d with score %d / %d; cols=%d, rows=%d; headers: %s",
+                             best["page"], best["score"], len(expected), len(best["headers"]), len(rows), best["headers"])
+                if len(best["pages"]) > 1:
+                    logger.debug("pdfplumber: stitched continuation pages %s", best["pages"][1:])
+                if self.layout_cache is not None and table_start:
+                    self._learn_layout(doc, best, table_start)
+                return ItemTable.from_rows(best["headers"], rows)
         except Exception as e:
-            print(f"pdfplumber table extraction error: {e}")
+            logger.warning("pdfplumber table extraction error: %s", e)
+        finally:
+            if doc is not source:
+                doc.close()
         return results
 
-    def process_pdf(self, pdf_path: Path) -> Dict[str, Any]:
-        """Process a single PDF file and return extracted data."""
-        print(f"Processing {pdf_path.name}...")
-        text = self.extract_text_from_pdf(pdf_path)
-        
-        # Extract fields
-        extracted_data = {}
-        for field_name, field_config in PDF_FIELDS.items():
-            value = self.extract_field_value(text, field_config)
-            extracted_data[field_name] = value
-        
-        # Extract table data if needed
-        if TABLE_CONFIG:
-            # Prefer pdfplumber table extraction when possible
-            section_anchor = TABLE_CONFIG.get("section_anchor")
-            if section_anchor and isinstance(section_anchor, str) and section_anchor.strip():
-                anchor_text = section_anchor.strip()
-            else:
-                anchor_text = extracted_data.get("coupon_description") if isinstance(extracted_data.get("coupon_description"), str) else None
-            table_data = self.extract_table_data_plumber(pdf_path, anchor_after_text=anchor_text)
-            if not table_data:
-                table_data = self.extract_table_data(text)
-            extracted_data["items"] = table_data
-        
+    def _page_workers(self, n_pages: int) -> int:
+        """Worker processes for the table search over ``n_pages`` pages (1: search in this process)."""
+        workers = int(self.config.get("page_workers") or 1)
+        if workers < 2 or n_pages < int(self.config.get("page_parallel_min_pages", 100)):
+            return 1
+        return min(workers, n_pages)
+
+    def _parallel_page_tables(
+        self, doc: PDFDocument, pages: range, prescan: Optional[Tuple[List[set], int]], workers: int
+    ) -> List[Tuple[int, Optional[bool], Optional[List[TableFragment]]]]:
+        """``_page_tables`` over contiguous slices of ``pages`` in ``workers`` processes, merged in page order."""
+        n_slices = min(len(pages), workers * 4)  # a few slices per worker evens out page costs
+        bounds = [pages.start + len(pages) * i // n_slices for i in range(n_slices + 1)]
+        results: List[Tuple[int, Optional[bool], Optional[List[TableFragment]]]] = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_page_tables_worker, self.config, doc.path, lo, hi, prescan, i > 0)
+                for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+            ]
+            for future in futures:
+                results.extend(future.result())
+        logger.debug("pdfplumber: searched %d pages in %d slices on %d workers", len(pages), n_slices, workers)
+        return results
+
+    def _layout_key(self, doc: PDFDocument, page_idx: int) -> Optional[str]:
+        """Layout fingerprint of the page holding the items-table header line, if it has one."""
+        marker = (TABLE_CONFIG.get("table_start") or "").lower()
+        header_line = next((line for line in doc.scan_text(page_idx).splitlines() if marker in line.lower()), None)
+        if header_line is None:
+            return None
+        page = doc.page(page_idx)
+        return layout_key(page.width, page.height, header_line, TABLE_CONFIG)
+
+    def _learn_layout(self, doc: PDFDocument, best: Dict[str, Any], table_start: str) -> None:
+        """Cache the geometry of a table picked by the full search for its layout."""
+        page_idx = best["page"] - 1
+        key = self._layout_key(doc, page_idx)
+        if key is None:
+            return
+        hits = doc.page(page_idx).search(table_start, regex=False, case=False)
+        bbox = best["bbox"]
+        if not hits or not bbox[1] <= hits[0]["top"] <= bbox[3]:
+            return  # header text is not inside the table; nothing reliable to crop to
+        self.layout_cache.put(key, {
+            "edges": best["edges"],
+            "bbox": list(bbox),
+            "header_key": best["header_key"],
+            "header_offset": hits[0]["top"] - bbox[1],
+        })
+        doc.metrics.count("layout_cache", "learned")
+
+    def process_pdf(
+        self,
+        pdf_path: Union[Path, PDFDocument],
+        fields: Optional[List[str]] = None,
+        include_table: bool = True,
+        known_fields: Optional[Dict[str, Any]] = None,
+        table_strategy: str = "auto",
+    ) -> Dict[str, Any]:
+        """Process a single PDF file and return extracted data.
+
+        ``fields`` restricts extraction to those PDF_FIELDS names and
+        ``include_table=False`` skips the items table; the result cache uses
+        these to redo only the parts a config edit invalidated. ``known_fields``
+        supplies previously extracted values the table anchor may depend on.
+        ``table_strategy="text"`` skips pdfplumber's ruled-table detection and
+        goes straight to the text fallbacks (word positions, then plain text);
+        this is the cheap retry for PDFs whose line art makes detection stall.
+        Pass an open PDFDocument (e.g. over in-memory bytes) to process it
+        without a file; it is left open for the caller to close.
+        """
+        if table_strategy not in ("auto", "text"):
+            raise ValueError(f"Unknown table_strategy {table_strategy!r}; use 'auto' or 'text'")
+        doc = pdf_path if isinstance(pdf_path, PDFDocument) else self.open_document(pdf_path)
+        logger.info("Processing %s...", doc.path.name)
+        trace_memory = bool(self.config.get("tracemalloc"))
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        try:
+            # Read fields with a configured region from their box, the rest page by
+            # page, stopping once all are resolved; the fast tier retries only its
+            # misses on pdfplumber text
+            with doc.metrics.stage("fields"):
+                fast = doc.text_engine == "pypdf"
+                from_regions = self.field_plan.extract_regions(doc.region_text, names=fields)
+                rest = [f.name for f in self.field_plan.fields
+                        if f.name not in from_regions and (fields is None or f.name in fields)]
+                extracted_data = self.field_plan.extract_pages(
+                    doc.iter_text(fast=fast), names=rest, miss_level=logging.DEBUG if fast else logging.WARNING
+                )
+                if fast:
+                    missing = [name for name, value in extracted_data.items() if value in ("", None)]
+                    if missing:
+                        extracted_data.update(self.field_plan.extract_pages(doc.iter_text(), names=missing))
+                extracted_data.update(from_regions)
+            doc.metrics.count("field_pages", doc.text_pages_read)
+
+            # Extract table data if needed
+            if TABLE_CONFIG and include_table:
+                # Prefer pdfplumber table extraction when possible
+                section_anchor = TABLE_CONFIG.get("section_anchor")
+                if section_anchor and isinstance(section_anchor, str) and section_anchor.strip():
+                    anchor_text = section_anchor.strip()
+                else:
+                    coupon = extracted_data.get("coupon_description", (known_fields or {}).get("coupon_description"))
+                    anchor_text = coupon if isinstance(coupon, str) else None
+                table_data = ItemTable([])
+                if table_strategy == "auto":
+                    table_data = self.extract_table_data_plumber(doc, anchor_after_text=anchor_text)
+                else:
+                    doc.metrics.count("table_strategy", table_strategy)
+                if not table_data:
+                    with doc.metrics.stage("fallback"):
+                        table_data = self.extract_table_data_words(doc, anchor_after_text=anchor_text)
+                        if not table_data:
+                            table_data = self.extract_table_data(self.extract_text_from_pdf(doc))
+                # Type money/quantity columns so the workbook gets real numbers
+                with doc.metrics.stage("typing"):
+                    rejects = convert_numeric_columns(table_data, TABLE_CONFIG.get("numeric_columns") or {})
+                if rejects:
+                    logger.warning("%s: %d numeric cells could not be converted; first: %s", doc.path.name, len(rejects), rejects[0])
+                extracted_data["items"] = table_data
+                extracted_data["rejects"] = rejects
+                doc.metrics.count("rows", len(table_data))
+                doc.metrics.count("rejects", len(rejects))
+
+            try:
+                doc.metrics.count("pages", doc.page_count)
+            except Exception:
+                pass
+            if trace_memory:
+                doc.metrics.count("peak_alloc_mb", round(tracemalloc.get_traced_memory()[1] / 2**20, 2))
+            extracted_data["metrics"] = doc.metrics
+        finally:
+            if doc is not pdf_path:
+                doc.close()
+
         return extracted_data
 
-    def save_results(self, data: Dict[str, Any], filename: str):
-        """Format the extracted data for Excel output."""
+    def save_results(self, data: Dict[str, Any], filename: str, col_widths: Optional[List[int]] = None):
+        """Format the extracted data for Excel output.
+
+        If ``col_widths`` is given, it is updated in place with the running
+        maximum text length of each column as rows are added, so a streaming
+        writer can size columns without a second pass over the cells.
+        """
         # Create a list to hold all rows for this sheet
         sheet_data = []
+
+        def add_row(row: Sequence[Any]) -> None:
+            sheet_data.append(row)
+            if col_widths is None:
+                return
+            if len(col_widths) < len(row):
+                # Blank cells measure as "None" in the in-memory writer; match its widths
+                col_widths.extend([4] * (len(row) - len(col_widths)))
+            for col_idx, value in enumerate(row):
+                length = len(str(value))
+                if length > col_widths[col_idx]:
+                    col_widths[col_idx] = length
         
         # Add invoice details as separate rows
-        sheet_data.append(["Invoice Number", data.get('invoice_number', '')])
-        sheet_data.append(["Coupon Description", data.get('coupon_description', '')])
-        sheet_data.append(["Campaign Description", data.get('campaign_description', '')])
-        sheet_data.append([])  # Empty row for spacing
+        add_row(["Invoice Number", data.get('invoice_number', '')])
+        add_row(["Coupon Description", data.get('coupon_description', '')])
+        add_row(["Campaign Description", data.get('campaign_description', '')])
+        add_row([])  # Empty row for spacing
         
         # Add table headers if there are items
-        if 'items' in data and data['items']:
-            # Get the headers from the first item
-            headers = list(data['items'][0].keys())
-            sheet_data.append(headers)
+        items: Optional[ItemTable] = data.get('items')
+        if items:
+            headers = list(items.headers)
+            add_row(headers)
             
             # Add all data rows
-            for item in data['items']:
-                sheet_data.append([item.get(header, '') for header in headers])
-            print(f"save_results: writing {len(data['items'])} table rows with headers: {headers}")
+            for row in items.rows():
+                add_row(row)
+            logger.debug("save_results: writing %d table rows with headers: %s", len(items), headers)
         
         return sheet_data
 
-    def process_all_pdfs(self):
-        """Process all PDF files in the input directory and save results."""
+    def process_all_pdfs(self, workers: Optional[int] = None, use_cache: Optional[bool] = None,
+                         streaming: Optional[bool] = None, metrics_path: Optional[Path] = None,
+                         timings: Optional[bool] = None, summary_path: Optional[Path] = None,
+                         pdf_files: Optional[Sequence[Path]] = None, formats: Optional[Sequence[str]] = None):
+        """Process all PDF files in the input directory and save results.
+
+        With ``workers`` > 1 the PDFs are processed in a process pool; sheets are
+        still written by this process in sorted file-name order. With the result
+        cache enabled, unchanged PDFs are rebuilt from cached results instead of
+        being parsed again. ``streaming`` writes through an openpyxl write-only
+        workbook, so each finished sheet is flushed to disk instead of being
+        held in memory until the end of the batch. Per-document stage timings are
+        appended to ``metrics_path`` as JSON lines, and ``timings`` prints a
+        summary table at the end. One JSON line per PDF (status, invoice number,
+        rows, rejects with the original text of each rejected cell, pages,
+        seconds, error) is written to ``summary_path``, by default
+        ``<output_dir>/run_summary.jsonl``, replacing the last run's.
+        ``pdf_files`` limits the run to those PDFs instead of the whole input folder.
+        With ``doc_timeout_s`` or ``doc_memory_mb`` set, each PDF runs in a
+        supervised child process that is killed at the limit; the PDF is then
+        retried with the text table parsers or quarantined (see
+        ``supervisor.py``).
+        ``formats`` (default ``output_format``) picks the outputs: ``excel`` for the
+        workbook, and ``csv``, ``parquet`` or ``sqlite`` for one long-format items
+        table across all PDFs (see ``writers.py``).
+        With ``dedup`` on, byte-identical copies (or, with ``dedup_by_id``, PDFs
+        with the same trailer ``/ID``) are not parsed and get no sheet; files
+        whose invoice number was already extracted from another file are
+        flagged in the log and the run summary.
+        """
+        if use_cache is None:
+            use_cache = bool(self.config.get("use_cache", True))
+        if use_cache or self.layout_cache is None:
+            return self._process_all_pdfs(workers, use_cache, streaming, metrics_path, timings, summary_path, pdf_files, formats)
+        # A run without caches must not read table geometry learned by earlier
+        # runs either; later calls on this processor get the layout cache back
+        layout_cache, config = self.layout_cache, self.config
+        self.layout_cache, self.config = None, {**config, "use_cache": False}
+        try:
+            return self._process_all_pdfs(workers, use_cache, streaming, metrics_path, timings, summary_path, pdf_files, formats)
+        finally:
+            self.layout_cache, self.config = layout_cache, config
+
+    def _process_all_pdfs(self, workers: Optional[int], use_cache: bool, streaming: Optional[bool],
+                          metrics_path: Optional[Path], timings: Optional[bool], summary_path: Optional[Path],
+                          pdf_files: Optional[Sequence[Path]], formats: Optional[Sequence[str]]):
+        """``process_all_pdfs`` with ``use_cache`` resolved."""
         from openpyxl import Workbook
-        from openpyxl.utils import get_column_letter
-        from openpyxl.styles import Font
         
-        pdf_files = list(self.input_dir.glob("*.pdf"))
+        pdf_files = sorted(pdf_files if pdf_files is not None else self.input_dir.glob("*.pdf"))
         
         if not pdf_files:
-            print(f"No PDF files found in {self.input_dir}")
+            logger.warning("No PDF files found in %s", self.input_dir)
             return
             
-        print(f"Found {len(pdf_files)} PDF files to process.")
+        logger.info("Found %d PDF files to process.", len(pdf_files))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        workers = int(workers if workers is not None else self.config.get("workers", 1) or 1)
+        if streaming is None:
+            streaming = bool(self.config.get("excel_streaming", False))
+        if metrics_path is None and self.config.get("metrics_file"):
+            metrics_path = Path(self.config["metrics_file"])
+        if timings is None:
+            timings = bool(self.config.get("print_timings", False))
+        formats = parse_formats(formats if formats is not None else self.config.get("output_format", EXCEL))
+        base_name = Path(self.config.get("output_filename", "kroger_data.xlsx")).stem
+        items_writers = open_items_writers(formats, self.output_dir, self.config.get("items_basename") or f"{base_name}_items", list(PDF_FIELDS))
+        write_excel = EXCEL in formats
+        recorder = MetricsRecorder(metrics_path)
+        if summary_path is None:
+            summary_path = Path(self.config.get("summary_file") or self.output_dir / "run_summary.jsonl")
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        summary = open(summary_path, "w", encoding="utf-8")
+
+        def log_result(pdf_file: Path, status: str, data: Optional[Dict[str, Any]] = None,
+                       error: Optional[str] = None, duplicate_of: Optional[str] = None) -> None:
+            data = data or {}
+            counts = data["metrics"].counts if data.get("metrics") else {}
+            record = {
+                "file": pdf_file.name,
+                "status": status,
+                "invoice_number": data.get("invoice_number"),
+                "rows": len(data.get("items") or []),
+                "rejects": len(data.get("rejects") or []),
+                # Unconvertible numeric cells are blank in every output; keep their text here
+                "rejected_cells": data.get("rejects") or [],
+                "pages": counts.get("pages"),
+                "seconds": round(data["metrics"].total, 4) if data.get("metrics") else None,
+                "error": error,
+                "duplicate_of": duplicate_of,
+            }
+            summary.write(json.dumps(record) + "\n")
         
         # Create a new Excel workbook
         output_path = self.output_dir / self.config.get('output_filename', 'kroger_data.xlsx')
-        wb = Workbook()
+        wb = Workbook(write_only=streaming)
         
         # Remove the default sheet if it exists
         if 'Sheet' in wb.sheetnames:
             del wb['Sheet']
         
+        # Decide per file what has to be extracted; fully cached files skip process_pdf
+        cache = None
+        cached: Dict[Path, Dict[str, Any]] = {}
+        digests: Dict[Path, str] = {}
+        tasks: List[Tuple[Path, Dict[str, Any]]] = []
+        if use_cache:
+            cache_dir = Path(self.config.get("cache_dir") or self.output_dir / ".cache")
+            cache = ResultCache(cache_dir, PDF_FIELDS, TABLE_CONFIG, self.config.get("text_engine", "pdfplumber"))
+        # Copies of a PDF already in the batch are skipped before any parsing
+        duplicates: Dict[Path, Path] = {}
+        if self.config.get("dedup", True):
+            duplicates = find_duplicates(pdf_files, digests, by_id=bool(self.config.get("dedup_by_id", False)))
+            if duplicates:
+                logger.info("Skipping %d duplicate PDF file(s).", len(duplicates))
+        invoices = InvoiceRegistry()
         for pdf_file in pdf_files:
+            if pdf_file in duplicates:
+                continue
+            if cache is None:
+                tasks.append((pdf_file, {}))
+                continue
             try:
-                print(f"Processing {pdf_file.name}...")
-                data = self.process_pdf(pdf_file)
-                
-                # Create a sheet for this PDF (use a shortened name if needed)
-                sheet_name = pdf_file.stem[:31]  # Excel sheet names max 31 chars
-                ws = wb.create_sheet(title=sheet_name)
-                
-                # Get the formatted data for this PDF
-                sheet_data = self.save_results(data, pdf_file.stem)
-                
-                # Detect the header row index in sheet_data
-                header_row_idx = None
-                for idx, row in enumerate(sheet_data, 1):
-                    if isinstance(row, list) and any(isinstance(c, str) and c.strip().lower() == 'line no' for c in row):
-                        header_row_idx = idx
-                        break
-                if header_row_idx is None:
-                    header_row_idx = 5  # default when we include 3 meta rows + blank
-
-                # Write data to the worksheet
-                for row_idx, row in enumerate(sheet_data, 1):
-                    for col_idx, value in enumerate(row, 1):
-                        cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                        # Style the header row
-                        if row_idx == header_row_idx:
-                            cell.font = Font(bold=True)
-
-                # Log rows written to this sheet based on detected header row
-                data_rows_written = max(0, len(sheet_data) - header_row_idx)
-                print(f"Excel: wrote {data_rows_written} data rows to sheet '{sheet_name}'")
-                
-                # Auto-adjust column widths
-                for column_cells in ws.columns:
-                    length = max(len(str(cell.value)) for cell in column_cells)
-                    ws.column_dimensions[get_column_letter(column_cells[0].column)].width = length + 2
-                
+                if pdf_file not in digests:
+                    digests[pdf_file] = file_digest(pdf_file)
+            except OSError as e:
+                logger.warning("Cache: could not hash %s: %s", pdf_file.name, e)
+                tasks.append((pdf_file, {}))
+                continue
+            cached[pdf_file], stale_fields, table_stale = cache.lookup(digests[pdf_file])
+            if stale_fields or table_stale:
+                tasks.append((pdf_file, {
+                    "fields": stale_fields,
+                    "include_table": table_stale,
+                    "known_fields": cached[pdf_file],
+                }))
+        
+        # With per-document limits every PDF runs in a supervised child process
+        supervisor = None
+        if tasks and (self.config.get("doc_timeout_s") or self.config.get("doc_memory_mb")):
+            from supervisor import DocumentSupervisor
+
+            supervisor = DocumentSupervisor(self.config, workers, self.config.get("quarantine_dir") or self.output_dir / "quarantine")
+            results = supervisor.run(tasks)
+        elif workers > 1 and len(tasks) > 1:
+            logger.info("Using %d worker processes.", workers)
+            results = self._iter_parallel_results(tasks, workers)
+        else:
+            results = self._iter_serial_results(tasks)
+        
+        # Both sources are in sorted file order, so merging keeps the sheet order stable
+        pending_tasks = {task[0] for task in tasks}
+        for pdf_file in pdf_files:
+            if pdf_file in duplicates:
+                logger.info("Duplicate of %s: %s", duplicates[pdf_file].name, pdf_file.name)
+                log_result(pdf_file, "duplicate", duplicate_of=duplicates[pdf_file].name)
+                continue
+            retry_reason = None
+            if pdf_file in pending_tasks:
+                _, data, error = next(results)
+                if error is not None:
+                    quarantined = supervisor is not None and pdf_file in supervisor.quarantined
+                    logger.error("Error processing %s: %s", pdf_file.name, error)
+                    log_result(pdf_file, "quarantined" if quarantined else "error", error=error)
+                    continue
+                data = {**cached.get(pdf_file, {}), **data}
+                if supervisor is not None:
+                    retry_reason = supervisor.retried.get(pdf_file)
+                # A text-path retry is not cached, so the next run tries the full extraction again
+                if cache is not None and pdf_file in digests and retry_reason is None:
+                    cache.store(digests[pdf_file], data, pdf_file.name)
+            else:
+                logger.debug("Cache hit: %s", pdf_file.name)
+                data = cached[pdf_file]
+            metrics = data.get("metrics") or DocumentMetrics(pdf_file.name)
+            metrics.count("cached", pdf_file not in pending_tasks)
+            data["metrics"] = metrics
+            status = "cached" if pdf_file not in pending_tasks else "retried" if retry_reason else "ok"
+            error = retry_reason
+            try:
+                with metrics.stage("write"):
+                    for writer in items_writers:
+                        writer.add(pdf_file.name, data)
+                    if write_excel:
+                        sheet_name = pdf_file.stem[:31]  # Excel sheet names max 31 chars
+                        if streaming:
+                            col_widths: List[int] = []
+                            sheet_data = self.save_results(data, pdf_file.stem, col_widths=col_widths)
+                            self._write_sheet_streaming(wb, sheet_name, sheet_data, col_widths)
+                        else:
+                            sheet_data = self.save_results(data, pdf_file.stem)
+                            self._write_sheet(wb, sheet_name, sheet_data)
             except Exception as e:
-                print(f"Error processing {pdf_file.name}: {str(e)}")
+                logger.error("Error processing %s: %s", pdf_file.name, e)
+                status, error = "error", str(e)
+            recorder.add(metrics)
+            log_result(pdf_file, status, data, error, invoices.check(pdf_file.name, data.get("invoice_number")))
         
-        # Save the workbook
-        if len(wb.sheetnames) > 0:
+        # Save the workbook and the items tables
+        saved = []
+        if write_excel and len(wb.sheetnames) > 0:
             wb.save(output_path)
-            print(f"\nAll data has been saved to: {output_path}")
+            saved.append(output_path)
+        for writer in items_writers:
+            try:
+                path = writer.close()
+            except Exception as e:
+                logger.error("Error writing %s: %s", writer.path, e)
+                continue
+            if path is not None:
+                saved.append(path)
+        if saved:
+            logger.info("All data has been saved to: %s", ", ".join(str(p) for p in saved))
         else:
-            print("No data was extracted from any PDFs.")
+            logger.warning("No data was extracted from any PDFs.")
+        if cache is not None:
+            logger.info("%s", cache.summary())
+        recorder.close()
+        summary.close()
+        logger.info("Run summary written to: %s", summary_path)
+        if timings:
+            print(recorder.summary())
+
+    def _iter_serial_results(self, tasks: List[Tuple[Path, Dict[str, Any]]]) -> Iterator[Tuple[Path, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield ``(pdf_file, data, error)`` for each ``(pdf_file, process_pdf kwargs)`` task, in this process."""
+        for pdf_file, kwargs in tasks:
+            try:
+                yield pdf_file, self.process_pdf(pdf_file, **kwargs), None
+            except Exception as e:
+                yield pdf_file, None, str(e)
+
+    def _iter_parallel_results(self, tasks: List[Tuple[Path, Dict[str, Any]]], workers: int) -> Iterator[Tuple[Path, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield ``(pdf_file, data, error)`` in task order, processing files in a process pool.
 
+        At most ``workers`` files are in flight. If a worker process dies, only the
+        files that were in flight are suspects: each is re-run alone so the crash
+        fails just the file that caused it, and the batch continues in a new pool.
+        """
+        results: Dict[int, Tuple[Optional[Dict[str, Any]], Optional[str]]] = {}
+        queue = deque(range(len(tasks)))
+        next_idx = 0
+        while queue:
+            in_flight: Dict[Future, int] = {}
+            crashed: List[int] = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                while queue or in_flight:
+                    while queue and not crashed and len(in_flight) < workers:
+                        idx = queue.popleft()
+                        in_flight[pool.submit(_process_pdf_worker, self.config, *tasks[idx])] = idx
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        idx = in_flight.pop(fut)
+                        try:
+                            results[idx] = fut.result()
+                        except BrokenProcessPool:
+                            crashed.append(idx)
+                        except Exception as e:
+                            results[idx] = (None, str(e))
+                    # Hand finished files to the writer as soon as their turn comes
+                    while next_idx in results:
+                        yield (tasks[next_idx][0],) + results.pop(next_idx)
+                        next_idx += 1
+            for idx in sorted(crashed):
+                if len(crashed) == 1:
+                    results[idx] = (None, "worker process crashed")
+                else:
+                    results[idx] = _run_isolated(self.config, *tasks[idx])
+            while next_idx in results:
+                yield (tasks[next_idx][0],) + results.pop(next_idx)
+                next_idx += 1
 
-def main():
+    @staticmethod
+    def _find_header_row(sheet_data: List[list]) -> int:
+        """1-based index of the table header row in formatted sheet rows."""
+        for idx, row in enumerate(sheet_data, 1):
+            if isinstance(row, (list, tuple)) and any(isinstance(c, str) and c.strip().lower() == 'line no' for c in row):
+                return idx
+        return 5  # default when we include 3 meta rows + blank
+
+    def _write_sheet(self, wb, sheet_name: str, sheet_data: List[list]) -> None:
+        """Write one PDF's formatted rows to a new sheet of ``wb``."""
+        from openpyxl.utils import get_column_letter
+        from openpyxl.styles import Font
+
+        # Create a sheet for this PDF
+        ws = wb.create_sheet(title=sheet_name)
+        
+        # Detect the header row index in sheet_data
+        header_row_idx = self._find_header_row(sheet_data)
+
+        # Write data to the worksheet
+        for row_idx, row in enumerate(sheet_data, 1):
+            for col_idx, value in enumerate(row, 1):
+                cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                # Style the header row
+                if row_idx == header_row_idx:
+                    cell.font = Font(bold=True)
+
+        # Log rows written to this sheet based on detected header row
+        data_rows_written = max(0, len(sheet_data) - header_row_idx)
+        logger.debug("Excel: wrote %d data rows to sheet '%s'", data_rows_written, sheet_name)
+        
+        # Auto-adjust column widths
+        for column_cells in ws.columns:
+            length = max(len(str(cell.value)) for cell in column_cells)
+            ws.column_dimensions[get_column_letter(column_cells[0].column)].width = length + 2
+
+
+    def _write_sheet_streaming(self, wb, sheet_name: str, sheet_data: List[list], col_widths: List[int]) -> None:
+        """Append one PDF's formatted rows to a new sheet of a write-only workbook.
+
+        Write-only sheets must have their column widths set before the first row,
+        so they come from ``col_widths`` tracked while the rows were built.
+        """
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+        from openpyxl.styles import Font
+
+        ws = wb.create_sheet(title=sheet_name)
+        for col_idx, length in enumerate(col_widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = length + 2
+
+        header_row_idx = self._find_header_row(sheet_data)
+        bold = Font(bold=True)
+        for row_idx, row in enumerate(sheet_data, 1):
+            if row_idx == header_row_idx:
+                cells = []
+                for value in row:
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.font = bold
+                    cells.append(cell)
+                ws.append(cells)
+            else:
+                ws.append(row)
+
+        data_rows_written = max(0, len(sheet_data) - header_row_idx)
+        logger.debug("Excel: wrote %d data rows to sheet '%s'", data_rows_written, sheet_name)
+
+
+def _process_pdf_worker(config: Dict[str, Any], pdf_path: Path, kwargs: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Process-pool entry point: return the extracted data for one PDF, or an error."""
+    if config.get("log_level") and not logging.getLogger().handlers:
+        # Spawned workers start without the parent's logging setup
+        configure_logging(config["log_level"])
+    try:
+        return PDFProcessor(config).process_pdf(pdf_path, **kwargs), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _page_tables_worker(config: Dict[str, Any], pdf_path: Path, start: int, stop: int,
+                        prescan: Optional[Tuple[List[set], int]], analyze_first: bool) -> List[Tuple[int, Optional[bool], Optional[List[TableFragment]]]]:
+    """Process-pool entry point: table fragments of pages ``start``..``stop - 1`` of one PDF."""
+    doc = PDFDocument(
+        pdf_path,
+        live_pages=config.get("live_pages", 8),
+        memory_limit_mb=config.get("memory_limit_mb"),
+        text_engine=config.get("text_engine", "pdfplumber"),
+    )
+    with doc:
+        return list(_page_tables(doc, range(start, stop), prescan, analyze_first))
+
+
+def _run_isolated(config: Dict[str, Any], pdf_path: Path, kwargs: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Run one PDF in its own single-worker pool so a crash is attributed to it alone."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            return pool.submit(_process_pdf_worker, config, pdf_path, kwargs).result()
+        except BrokenProcessPool:
+            return None, "worker process crashed"
+
+
+def configure_logging(level: Union[int, str] = logging.INFO, log_file: Optional[Path] = None) -> None:
+    """Log plain messages to the console at ``level``; ``log_file`` also gets timestamps."""
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    handlers[0].setFormatter(logging.Formatter("%(message)s"))
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        handlers.append(file_handler)
+    logging.basicConfig(level=level, handlers=handlers, force=True)
+    # pdfminer logs every token at DEBUG; keep it to warnings even with --verbose
+    logging.getLogger("pdfminer").setLevel(logging.WARNING)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract Kroger invoice data from PDFs into an Excel workbook.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: PDF_SETTINGS['workers'] or 1)")
+    parser.add_argument("--page-workers", type=int, default=None, metavar="N",
+                        help="search the pages of long PDFs for tables in N processes (default: PDF_SETTINGS['page_workers'])")
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS",
+                        help="kill a PDF's extraction after SECONDS (default: PDF_SETTINGS['doc_timeout_s'])")
+    parser.add_argument("--max-memory", type=float, default=None, metavar="MB",
+                        help="kill a PDF's extraction above MB of memory (default: PDF_SETTINGS['doc_memory_mb'])")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the result cache and re-extract every PDF")
+    parser.add_argument("--streaming", action="store_true", default=None,
+                        help="write the workbook with a low-memory write-only writer")
+    parser.add_argument("--metrics", type=Path, default=None, metavar="FILE",
+                        help="append per-document stage timings to FILE as JSON lines")
+    parser.add_argument("--timings", action="store_true", default=None,
+                        help="print a per-stage timing summary and the slowest documents")
+    parser.add_argument("--profile", type=Path, default=None, metavar="FILE",
+                        help="run under cProfile and write the stats to FILE (profiles this process only)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="record each document's peak Python allocation in its metrics")
+    parser.add_argument("--format", nargs="+", default=None, metavar="FORMAT", dest="formats",
+                        help="outputs to write: excel, csv, parquet, sqlite (default: PDF_SETTINGS['output_format'])")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running: process PDFs as they appear in the input folder")
+    parser.add_argument("--summary", type=Path, default=None, metavar="FILE",
+                        help="write the per-file run summary (JSON lines) to FILE")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true",
+                           help="only log warnings and errors")
+    verbosity.add_argument("-v", "--verbose", action="store_true",
+                           help="log per-field and per-table detail")
+    parser.add_argument("--log-file", type=Path, default=None, metavar="FILE",
+                        help="also write the log, with timestamps, to FILE")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the PDF processor."""
+    args = parse_args(argv)
+    settings = dict(PDF_SETTINGS)
+    level = logging.WARNING if args.quiet else logging.DEBUG if args.verbose else settings.get("log_level", logging.INFO)
+    settings["log_level"] = level
+    configure_logging(level, args.log_file or settings.get("log_file"))
+    if args.tracemalloc:
+        settings["tracemalloc"] = True
+    if args.page_workers is not None:
+        settings["page_workers"] = args.page_workers
+    if args.timeout is not None:
+        settings["doc_timeout_s"] = args.timeout
+    if args.max_memory is not None:
+        settings["doc_memory_mb"] = args.max_memory
+    if args.no_cache:
+        settings["use_cache"] = False
+    profiler = cProfile.Profile() if args.profile else None
     try:
-        processor = PDFProcessor(PDF_SETTINGS)
-        processor.process_all_pdfs()
-        print("PDF processing completed successfully!")
+        processor = PDFProcessor(settings)
+        if profiler is not None:
+            profiler.enable()
+        if args.watch:
+            import asyncio
+            from watcher import IngestionService
+
+            if args.workers is not None:
+                settings["workers"] = args.workers
+            try:
+                asyncio.run(IngestionService(processor, settings).run())
+            except KeyboardInterrupt:
+                pass
+            return
+        processor.process_all_pdfs(
+            workers=args.workers,
+            use_cache=False if args.no_cache else None,
+            streaming=args.streaming,
+            metrics_path=args.metrics,
+            timings=args.timings,
+            summary_path=args.summary,
+            formats=args.formats,
+        )
+        logger.info("PDF processing completed successfully!")
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        logger.exception("An error occurred: %s", e)
         raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile written to {args.profile}; top functions by cumulative time:")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,131 @@
+"""
+On-disk cache of per-PDF extraction results.
+
+Each document gets one JSON file named after the SHA-256 of its bytes. Every
+cached part carries a fingerprint of the configuration that produced it: one
+per entry in PDF_FIELDS and one for the items table (TABLE_CONFIG). Editing a
+field's config therefore only invalidates that field, and the expensive table
+extraction is reused unless TABLE_CONFIG changes. Results from the fast
+pypdf text tier are fingerprinted separately from pdfplumber-only results.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from item_table import ItemTable
+
+# Bump when extraction logic changes in a way that makes old results stale
+CACHE_VERSION = 4
+
+
+def _json_default(obj: Any) -> Any:
+    # Field configs hold python types (e.g. "type": str)
+    if isinstance(obj, type):
+        return obj.__name__
+    return repr(obj)
+
+
+def fingerprint(obj: Any) -> str:
+    """Stable short hash of a config object."""
+    blob = json.dumps([CACHE_VERSION, obj], sort_keys=True, default=_json_default)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir: Path, fields_config: Dict[str, Any], table_config: Dict[str, Any],
+                 text_engine: str = "pdfplumber"):
+        """Initialize the cache for the given extraction configuration."""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # The default engine keeps the plain fingerprints so existing entries stay valid
+        engine = [] if text_engine == "pdfplumber" else [text_engine]
+        self.field_fps = {name: fingerprint([cfg, *engine] if engine else cfg) for name, cfg in fields_config.items()}
+        table_inputs: Dict[str, Any] = {"table": table_config}
+        if engine:
+            table_inputs["text_engine"] = text_engine
+        # Without a section anchor the table search starts at the coupon description value
+        if not (table_config.get("section_anchor") or "").strip():
+            table_inputs["coupon_description"] = self.field_fps.get("coupon_description")
+        self.table_fp = fingerprint(table_inputs) if table_config else None
+        self.hits = 0
+        self.misses = 0
+        self.partial = 0
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.json"
+
+    def lookup(self, digest: str) -> Tuple[Dict[str, Any], List[str], bool]:
+        """Return ``(cached_data, stale_fields, table_stale)`` for a document digest.
+
+        ``cached_data`` holds every part whose fingerprint still matches; the
+        caller only needs to extract ``stale_fields`` and, if ``table_stale``,
+        the items table.
+        """
+        entry: Dict[str, Any] = {}
+        path = self._entry_path(digest)
+        if path.exists():
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                entry = {}
+
+        cached: Dict[str, Any] = {}
+        stale_fields: List[str] = []
+        for name, fp in self.field_fps.items():
+            part = entry.get("fields", {}).get(name)
+            if part and part.get("fingerprint") == fp:
+                cached[name] = part.get("value")
+            else:
+                stale_fields.append(name)
+        table_stale = False
+        if self.table_fp is not None:
+            part = entry.get("items")
+            if part and part.get("fingerprint") == self.table_fp:
+                cached["items"] = ItemTable.from_dict(part.get("table") or {})
+                cached["rejects"] = part.get("rejects", [])
+            else:
+                table_stale = True
+
+        if not stale_fields and not table_stale:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if cached:
+                self.partial += 1
+        return cached, stale_fields, table_stale
+
+    def store(self, digest: str, data: Dict[str, Any], source_name: str = "") -> None:
+        """Write the full result for a document, replacing any previous entry."""
+        entry: Dict[str, Any] = {
+            "version": CACHE_VERSION,
+            "file": source_name,
+            "fields": {
+                name: {"fingerprint": fp, "value": data.get(name, "")}
+                for name, fp in self.field_fps.items()
+            },
+        }
+        if self.table_fp is not None:
+            items = data.get("items") or ItemTable([])
+            entry["items"] = {
+                "fingerprint": self.table_fp,
+                "table": items.to_dict(),
+                "rejects": data.get("rejects", []),
+            }
+        path = self._entry_path(digest)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry, default=_json_default), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hits, {self.misses} misses ({self.partial} partial)"
@@ -0,0 +1,186 @@
+"""
+Supervised batch execution with per-document limits.
+
+Each PDF runs in its own child process, at most ``workers`` at a time. The
+parent polls every child: one that runs longer than ``doc_timeout_s`` seconds
+or whose resident memory exceeds ``doc_memory_mb`` is killed, so a
+pathological PDF (e.g. a vector-heavy page that makes table detection run
+for minutes) cannot stall the batch. A killed PDF is retried once without
+pdfplumber's ruled-table detection, using only the text fallbacks
+(``table_strategy="text"``), if ``timeout_retry_text`` is on. If that also
+fails, or retries are off, the file is moved to the quarantine folder and the
+reason is appended to ``quarantine.jsonl`` there.
+"""
+import json
+import logging
+import multiprocessing
+import shutil
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from pdf_processor import _process_pdf_worker, _rss_mb
+
+logger = logging.getLogger(__name__)
+
+Task = Tuple[Path, Dict[str, Any]]
+_POLL_S = 0.2  # how often running children are checked against the limits
+
+
+def _supervised_worker(conn, config: Dict[str, Any], pdf_path: Path, kwargs: Dict[str, Any]) -> None:
+    """Child process entry point: send ``(data, error)`` for one PDF back to the supervisor."""
+    try:
+        conn.send(_process_pdf_worker(config, pdf_path, kwargs))
+    finally:
+        conn.close()
+
+
+def _descendants(pid: int) -> list:
+    """psutil handles of all processes started by ``pid`` (empty without psutil)."""
+    try:
+        import psutil
+        return psutil.Process(pid).children(recursive=True)
+    except Exception:
+        return []
+
+
+class _Job:
+    def __init__(self, idx: int, pdf_path: Path, kwargs: Dict[str, Any], retry_of: Optional[str] = None):
+        self.idx = idx
+        self.pdf_path = pdf_path
+        self.kwargs = kwargs
+        self.retry_of = retry_of  # why the full extraction was killed, for a text-path retry
+        self.process = None
+        self.conn = None
+        self.started = 0.0
+
+    def start(self, context, config: Dict[str, Any]) -> None:
+        self.conn, child_conn = context.Pipe(duplex=False)
+        # Not daemonic: the child may start its own pool for page_workers; run()
+        # kills any child still running when it exits
+        self.process = context.Process(target=_supervised_worker, args=(child_conn, config, self.pdf_path, self.kwargs))
+        self.process.start()
+        child_conn.close()
+        self.started = time.monotonic()
+
+    def kill(self) -> None:
+        # Page workers the child started would otherwise be left running
+        for child in _descendants(self.process.pid):
+            try:
+                child.kill()
+            except Exception:
+                pass
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class DocumentSupervisor:
+    def __init__(self, config: Dict[str, Any], workers: int = 1, quarantine_dir: Optional[Path] = None):
+        """Run ``process_pdf`` tasks in child processes under the limits in ``config``."""
+        self.config = config
+        self.workers = max(1, int(workers or 1))
+        timeout = config.get("doc_timeout_s")
+        memory = config.get("doc_memory_mb")
+        self.timeout_s = float(timeout) if timeout else None
+        self.memory_mb = float(memory) if memory else None
+        if self.memory_mb is not None and _rss_mb() is None:
+            logger.warning("doc_memory_mb is set but process memory cannot be read here (install psutil); "
+                           "only the timeout is enforced")
+        self.retry_text = bool(config.get("timeout_retry_text", True))
+        self.quarantine_dir = Path(quarantine_dir or config.get("quarantine_dir") or "quarantine")
+        self.quarantined: Dict[Path, str] = {}  # file -> why it was quarantined
+        self.retried: Dict[Path, str] = {}  # file -> why its full extraction was replaced by the text path
+        self._context = multiprocessing.get_context()
+
+    def run(self, tasks: List[Task]) -> Iterator[Tuple[Path, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield ``(pdf_file, data, error)`` for each ``(pdf_file, process_pdf kwargs)`` task, in task order."""
+        queue: Deque[_Job] = deque(_Job(idx, path, kwargs) for idx, (path, kwargs) in enumerate(tasks))
+        running: List[_Job] = []
+        results: Dict[int, Tuple[Optional[Dict[str, Any]], Optional[str]]] = {}
+        next_idx = 0
+        try:
+            while queue or running:
+                while queue and len(running) < self.workers:
+                    job = queue.popleft()
+                    job.start(self._context, self.config)
+                    running.append(job)
+                wait([job.conn for job in running] + [job.process.sentinel for job in running], _POLL_S)
+                for job in list(running):
+                    outcome = self._check(job)
+                    if outcome is None:
+                        continue
+                    running.remove(job)
+                    retry = self._finish(job, outcome, results)
+                    if retry is not None:
+                        queue.appendleft(retry)
+                while next_idx in results:
+                    yield (tasks[next_idx][0],) + results.pop(next_idx)
+                    next_idx += 1
+        finally:
+            for job in running:
+                job.kill()
+
+    def _check(self, job: _Job) -> Optional[Tuple[str, Any]]:
+        """``("done", (data, error))``, ``("killed", reason)``, or None while the job is still running."""
+        if job.conn.poll():
+            try:
+                result = job.conn.recv()
+            except EOFError:
+                result = (None, "worker process crashed")
+            job.process.join()
+            job.conn.close()
+            return "done", result
+        if not job.process.is_alive():
+            job.conn.close()
+            return "done", (None, f"worker process crashed (exit code {job.process.exitcode})")
+        elapsed = time.monotonic() - job.started
+        if self.timeout_s is not None and elapsed > self.timeout_s:
+            job.kill()
+            return "killed", f"timed out after {self.timeout_s:g}s"
+        if self.memory_mb is not None:
+            rss = _rss_mb(job.process.pid)
+            if rss is not None and rss > self.memory_mb:
+                job.kill()
+                return "killed", f"used {rss:.0f} MB (limit {self.memory_mb:g} MB)"
+        return None
+
+    def _finish(self, job: _Job, outcome: Tuple[str, Any], results: Dict[int, Tuple[Optional[Dict[str, Any]], Optional[str]]]) -> Optional[_Job]:
+        """Record a finished job; returns the text-path retry to run next, if any."""
+        kind, value = outcome
+        name = job.pdf_path.name
+        if kind == "done":
+            data, error = value
+            if job.retry_of is not None and error is None:
+                self.retried[job.pdf_path] = job.retry_of
+                logger.warning("%s: %s; used the text table parsers instead", name, job.retry_of)
+            elif job.retry_of is not None:
+                error = f"{job.retry_of}; text-path retry failed: {error}"
+                self._quarantine(job.pdf_path, error)
+            results[job.idx] = (data, error)
+            return None
+        reason = value
+        if job.retry_of is None and self.retry_text and job.kwargs.get("include_table", True):
+            logger.warning("%s: %s; retrying with the text table parsers", name, reason)
+            return _Job(job.idx, job.pdf_path, {**job.kwargs, "table_strategy": "text"}, retry_of=reason)
+        if job.retry_of is not None:
+            reason = f"{job.retry_of}; text-path retry {reason}"
+        self._quarantine(job.pdf_path, reason)
+        results[job.idx] = (None, reason)
+        return None
+
+    def _quarantine(self, pdf_path: Path, reason: str) -> None:
+        """Move ``pdf_path`` out of the input folder and record why."""
+        self.quarantined[pdf_path] = reason
+        record = {"file": pdf_path.name, "reason": reason, "quarantined_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        try:
+            self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(pdf_path), str(self.quarantine_dir / pdf_path.name))
+            with open(self.quarantine_dir / "quarantine.jsonl", "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning("Could not quarantine %s: %s", pdf_path.name, e)
+            return
+        logger.error("Quarantined %s: %s", pdf_path.name, reason)
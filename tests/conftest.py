@@ -0,0 +1,7 @@
+"""Shared setup: import the modules from the repository root and the synthetic invoice generator."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,28 @@
+from config import PDF_SETTINGS, TABLE_CONFIG
+from pdf_processor import PDFProcessor
+
+TEXT = "\n".join([
+    "Line no   Item   Description   Qty",
+    "1   A100   Apples   4",
+    "2   B200   Bananas   6   extra",
+    "3   C300   Cherries",
+    "Store name   Somewhere",
+])
+
+
+def test_configured_headers_that_do_not_match_the_header_line(monkeypatch):
+    # Three configured headers against a four-label header line: rows are split on spaces instead
+    monkeypatch.setitem(TABLE_CONFIG, "table_headers", ["Line no", "Item", "Description"])
+    table = PDFProcessor(dict(PDF_SETTINGS, layout_cache=False)).extract_table_data(TEXT)
+    assert table.headers == ["Line no", "Item", "Description"]
+    assert table.records() == [
+        {"Line no": "1", "Item": "A100", "Description": "Apples"},
+        {"Line no": "2", "Item": "B200", "Description": "Bananas"},
+        {"Line no": "3", "Item": "C300", "Description": "Cherries"},
+    ]
+
+
+def test_configured_headers_pad_short_rows(monkeypatch):
+    monkeypatch.setitem(TABLE_CONFIG, "table_headers", ["Line no", "Item", "Description", "Qty", "Price"])
+    table = PDFProcessor(dict(PDF_SETTINGS, layout_cache=False)).extract_table_data(TEXT)
+    assert [row[-2:] for row in table.rows()] == [("4", ""), ("6", "extra"), ("", "")]
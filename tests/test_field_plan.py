@@ -0,0 +1,84 @@
+import logging
+import random
+
+import pytest
+
+from bench_field_plan import per_call_field_value
+from config import PDF_SETTINGS
+from field_plan import FieldExtractionPlan, LabelIndex
+from pdf_processor import PDFProcessor
+
+FIELDS = {
+    "invoice": {"labels": ["Invoice number"], "type": str, "value_regex": r"\b\d{3}-[A-Z0-9]{3,}-\d{2,}\b"},
+    "description": {"labels": ["Coupon description", "Description"], "type": str},
+    "campaign": {"labels": ["Campaign description", "Campaign"], "type": str, "value_regex": r"\b[A-Z]\d+[A-Z]\d+\b"},
+    "qty": {"labels": ["Total qty", "Qty"], "type": int},
+    "store": {"label": r"Store\s*#\s*(\d+)", "is_regex": True, "group": 1},
+}
+WORDS = [
+    "Invoice number", "Invoice no", "Coupon description", "Description", "Campaign description", "Campaign",
+    "Total qty", "Qty", "Store #", "060-C2505-12345", "061-ABC-99", "P4W2", "Q1W9", "12", "7", "lorem", ":", "-",
+    "", "   ", "\t",
+]
+
+
+def random_pages(rng: random.Random):
+    return [
+        "\n".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3))) for _ in range(rng.randint(0, 12)))
+        for _ in range(rng.randint(1, 5))
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_extract_pages_matches_extract_on_the_full_text(seed):
+    # Without "pages" limits, reading page by page must give what the whole text gives
+    logging.disable(logging.CRITICAL)
+    try:
+        plan = FieldExtractionPlan(FIELDS)
+        rng = random.Random(seed)
+        for _ in range(2000):
+            pages = random_pages(rng)
+            assert plan.extract_pages(iter(pages)) == plan.extract("\n".join(pages) + "\n"), pages
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_extract_matches_the_per_call_reference():
+    plan = FieldExtractionPlan(FIELDS)
+    processor = PDFProcessor(dict(PDF_SETTINGS, layout_cache=False))
+    rng = random.Random(0)
+    logging.disable(logging.CRITICAL)
+    try:
+        for _ in range(2000):
+            text = "\n".join(random_pages(rng))
+            expected = {name: per_call_field_value(text, cfg) for name, cfg in FIELDS.items()}
+            assert plan.extract(text) == expected, text
+            assert processor.extract_field_value(text, FIELDS["qty"]) == expected["qty"]
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_label_index_finds_labels_cut_between_chunks():
+    plan = FieldExtractionPlan(FIELDS)
+    rng = random.Random(0)
+    for _ in range(500):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 20)))
+        cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 6))))
+        idx = LabelIndex(plan, "", plan.labels)
+        for lo, hi in zip([0, *cuts], [*cuts, len(text)]):
+            idx.extend(text[lo:hi], plan.labels)
+        assert idx.first == LabelIndex(plan, text, plan.labels).first, (text, cuts)
+        assert idx.text == text
+
+
+def test_extract_pages_stops_reading_once_fields_are_settled():
+    plan = FieldExtractionPlan({"invoice": FIELDS["invoice"]})
+    read = []
+
+    def pages():
+        for n in range(50):
+            read.append(n)
+            yield "Invoice number 060-C2505-12345\nmore text" if n == 0 else "filler"
+
+    assert plan.extract_pages(pages()) == {"invoice": "060-C2505-12345"}
+    assert read == [0]
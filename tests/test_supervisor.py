@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from config import PDF_SETTINGS
+from pdf_processor import PDFProcessor
+from supervisor import DocumentSupervisor
+from synthetic_invoice import write_invoice_pdf
+
+
+def test_supervised_child_can_split_the_page_search(tmp_path: Path):
+    # Supervised children must be able to start the page-parallel table search
+    pdf = write_invoice_pdf(tmp_path / "060-C2505-77777.pdf", invoice_number="060-C2505-77777", rows=300, filler_pages=0)
+    config = dict(PDF_SETTINGS, output_dir=str(tmp_path), layout_cache=False,
+                  page_workers=2, page_parallel_min_pages=2, doc_timeout_s=120)
+    [(_, data, error)] = list(DocumentSupervisor(config, quarantine_dir=tmp_path / "q").run([(pdf, {})]))
+    assert error is None
+    assert data["metrics"].counts.get("page_workers") == 2
+
+    serial = PDFProcessor(dict(config, page_workers=1)).process_pdf(pdf)
+    assert data["items"].headers == serial["items"].headers
+    assert data["items"].columns == serial["items"].columns
+    assert len(data["items"]) == 300
@@ -0,0 +1,24 @@
+import asyncio
+from pathlib import Path
+
+from config import PDF_SETTINGS
+from pdf_processor import PDFProcessor
+from watcher import IngestionService
+
+
+def test_service_built_outside_the_loop_runs_and_stops(tmp_path: Path):
+    # The service is created before asyncio.run(); its queue, event and lock must belong to that loop
+    (tmp_path / "in").mkdir()
+    config = dict(PDF_SETTINGS, input_dir=str(tmp_path / "in"), output_dir=str(tmp_path / "out"),
+                  layout_cache=False, use_cache=False, watch_interval=0.05)
+    service = IngestionService(PDFProcessor(config), config)
+
+    async def main():
+        task = asyncio.create_task(service.run())
+        await asyncio.sleep(0.2)
+        service.stop()
+        await asyncio.wait_for(task, 30)
+
+    asyncio.run(main())
+    asyncio.run(main())  # and again on a fresh loop
+    assert service.processed == 0 and service.failed == 0
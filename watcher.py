@@ -0,0 +1,258 @@
+"""
+Long-running ingestion mode: watch the input folder and process new PDFs.
+
+The service polls ``input_dir`` on an asyncio loop. A PDF is queued once its
+size and modification time have stayed the same for ``watch_settle_s``
+seconds and it ends with a PDF trailer, so files still being copied in are
+not picked up half-written. A bounded queue feeds ``workers`` consumers that
+run ``process_pdf`` in a process pool. Each result goes into the result
+cache and is appended to a JSON-lines store as soon as it is ready. The
+Excel workbook is rebuilt from the cache when the queue has been idle for
+``watch_refresh_s`` seconds; with the result cache off (``--no-cache``)
+there is nothing to rebuild it from and only the store is written.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from config import PDF_FIELDS, TABLE_CONFIG
+from pdf_processor import _process_pdf_worker
+from result_cache import ResultCache, file_digest
+
+logger = logging.getLogger(__name__)
+
+# (size, mtime_ns) of a file as last seen by the poller
+Signature = Tuple[int, int]
+
+
+def _has_pdf_trailer(path: Path, tail: int = 1024) -> bool:
+    """True if the last ``tail`` bytes of ``path`` contain ``%%EOF``."""
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            fh.seek(max(0, fh.tell() - tail))
+            return b"%%EOF" in fh.read()
+    except OSError:
+        return False
+
+
+def _shutdown(pool: ProcessPoolExecutor, wait: bool = True) -> None:
+    """Shut ``pool`` down, dropping work that has not started where Python supports it (3.9+)."""
+    if sys.version_info >= (3, 9):
+        pool.shutdown(wait=wait, cancel_futures=True)
+    else:
+        pool.shutdown(wait=wait)
+
+
+class IngestionService:
+    def __init__(self, processor, config: Optional[Dict[str, Any]] = None):
+        """Watch ``processor.input_dir`` using ``processor``'s settings (or ``config``)."""
+        self.processor = processor
+        self.config = config if config is not None else processor.config
+        self.input_dir: Path = processor.input_dir
+        self.interval = float(self.config.get("watch_interval", 1.0))
+        self.settle_s = float(self.config.get("watch_settle_s", 2.0))
+        self.refresh_s = self.config.get("watch_refresh_s", 10.0)
+        self.workers = max(1, int(self.config.get("workers", 1) or 1))
+        self.store_path = Path(self.config.get("ingest_file") or processor.output_dir / "ingested.jsonl")
+        self.queue_size = int(self.config.get("watch_queue_size", 100))
+        self.cache = None
+        if self.config.get("use_cache", True):
+            cache_dir = Path(self.config.get("cache_dir") or processor.output_dir / ".cache")
+            self.cache = ResultCache(cache_dir, PDF_FIELDS, TABLE_CONFIG, self.config.get("text_engine", "pdfplumber"))
+        elif self.refresh_s is not None:
+            logger.warning("The result cache is off, so the workbook will not be rebuilt; results only go to %s",
+                           self.store_path)
+        # Loop objects are created in run(), on the loop that uses them
+        self.queue: "Optional[asyncio.Queue[Path]]" = None
+        self._stop: Optional[asyncio.Event] = None
+        self._refreshing: Optional[asyncio.Lock] = None  # consumers wait while the workbook is rebuilt
+        self._stop_requested = False
+        self._pending: Dict[Path, Tuple[Signature, float]] = {}  # candidate -> (signature, stable since)
+        self._done: Dict[Path, Signature] = {}  # signature each file was last queued with
+        self._ingested: Set[Path] = set()  # files with a stored result, for the workbook
+        self._stored: Set[str] = set()  # file names already in the store from earlier runs
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._active = 0  # files being extracted right now
+        self._dirty = False  # results added since the last workbook refresh
+        self._last_result = 0.0
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self) -> None:
+        """Ask ``run`` to finish the files already queued and return."""
+        self._stop_requested = True
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(self) -> None:
+        """Poll, process and store until ``stop()`` is called (or the task is cancelled)."""
+        logger.info("Watching %s for new PDFs (Ctrl+C to stop)...", self.input_dir)
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self._stored = self._read_stored()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stop = asyncio.Event()
+        self._refreshing = asyncio.Lock()
+        if self._stop_requested:
+            self._stop.set()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        try:
+            while not self._stop.is_set():
+                await self._poll()
+                idle = self.queue.empty() and not self._active
+                if self._dirty and self.refresh_s is not None and idle \
+                        and time.monotonic() - self._last_result >= float(self.refresh_s):
+                    await self._refresh_workbook()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.queue.join()
+            if self._dirty and self.refresh_s is not None:
+                await self._refresh_workbook()
+        finally:
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            _shutdown(self._pool)
+            logger.info("Ingestion stopped: %d processed, %d failed.", self.processed, self.failed)
+
+    async def _poll(self) -> None:
+        """Queue every PDF whose signature has been stable for ``settle_s`` seconds."""
+        now = time.monotonic()
+        try:
+            entries = [e for e in os.scandir(self.input_dir) if e.is_file() and e.name.lower().endswith(".pdf")]
+        except OSError as e:
+            logger.warning("Cannot list %s: %s", self.input_dir, e)
+            return
+        seen = set()
+        for entry in sorted(entries, key=lambda e: e.name):
+            path = Path(entry.path)
+            seen.add(path)
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+            if self._done.get(path) == sig:
+                continue
+            prev = self._pending.get(path)
+            if prev is None or prev[0] != sig:
+                self._pending[path] = (sig, now)
+                continue
+            if now - prev[1] < self.settle_s or not _has_pdf_trailer(path):
+                continue
+            del self._pending[path]
+            self._done[path] = sig
+            await self.queue.put(path)  # waits while the queue is full
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+
+    async def _consume(self) -> None:
+        while True:
+            path = await self.queue.get()
+            try:
+                async with self._refreshing:
+                    self._active += 1
+                try:
+                    await self._ingest(path)
+                finally:
+                    self._active -= 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("Error processing %s: %s", path.name, e)
+            finally:
+                self.queue.task_done()
+
+    async def _ingest(self, path: Path) -> None:
+        """Extract one PDF (reusing cached parts) and append it to the store."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        digest = None
+        cached: Dict[str, Any] = {}
+        kwargs: Optional[Dict[str, Any]] = {}
+        if self.cache is not None:
+            digest = await loop.run_in_executor(None, file_digest, path)
+            cached, stale_fields, table_stale = self.cache.lookup(digest)
+            kwargs = None
+            if stale_fields or table_stale:
+                kwargs = {"fields": stale_fields, "include_table": table_stale, "known_fields": cached}
+        status = "cached"
+        data = cached
+        if kwargs is not None:
+            status = "ok"
+            try:
+                result, error = await loop.run_in_executor(self._pool, _process_pdf_worker, self.config, path, kwargs)
+            except BrokenProcessPool:
+                _shutdown(self._pool, wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                result, error = None, "worker process crashed"
+            if error is not None:
+                self.failed += 1
+                logger.error("Error processing %s: %s", path.name, error)
+                self._append({"file": path.name, "status": "error", "error": error})
+                return
+            data = {**cached, **result}
+            if self.cache is not None:
+                self.cache.store(digest, data, path.name)
+        items = data.get("items")
+        if status == "cached" and path.name in self._stored:
+            # Unchanged since an earlier run already stored it
+            self._ingested.add(path)
+            logger.debug("Already ingested: %s", path.name)
+            return
+        record = {
+            "file": path.name,
+            "status": status,
+            "ingested_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "latency_s": round(time.perf_counter() - started, 3),
+            **{name: data.get(name) for name in PDF_FIELDS},
+            "items": items.to_dict() if items is not None else None,
+            "rejects": data.get("rejects", []),
+        }
+        self._append(record)
+        self._ingested.add(path)
+        self.processed += 1
+        self._dirty = True
+        self._last_result = time.monotonic()
+        logger.info("Ingested %s: %d rows (%s, %.2fs)", path.name, len(items or []), status, record["latency_s"])
+
+    def _read_stored(self) -> Set[str]:
+        names: Set[str] = set()
+        try:
+            with open(self.store_path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("status") != "error":
+                        names.add(record.get("file"))
+        except OSError:
+            pass
+        return names
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with open(self.store_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, default=str) + "\n")
+
+    async def _refresh_workbook(self) -> None:
+        """Rebuild the workbook of all ingested PDFs from the result cache without blocking the loop."""
+        self._dirty = False
+        if self.cache is None:
+            return
+        loop = asyncio.get_running_loop()
+        files = sorted(p for p in self._ingested if p.exists())
+        async with self._refreshing:
+            await loop.run_in_executor(
+                None, lambda: self.processor.process_all_pdfs(workers=1, use_cache=True, pdf_files=files)
+            )
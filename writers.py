@@ -0,0 +1,157 @@
+"""
+Columnar output backends for batch runs.
+
+Besides the per-PDF Excel workbook, a run can write every PDF's line items as
+one long-format table: ``source_file`` and the PDF_FIELDS values (invoice,
+coupon, campaign) repeated on each item row, followed by the item columns.
+Documents with different table headers are aligned by column name. Each
+writer collects one DataFrame per PDF straight from its ItemTable columns and
+writes the combined table in bulk on ``close()``.
+"""
+import importlib.util
+from abc import ABC, abstractmethod
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+EXCEL = "excel"
+
+
+def parse_formats(value: Union[str, Sequence[str], None]) -> List[str]:
+    """Normalize ``output_format`` (``"excel"``, ``"excel,csv"`` or a list) to lower-case names."""
+    if not value:
+        return [EXCEL]
+    names = value.split(",") if isinstance(value, str) else list(value)
+    formats = []
+    for name in names:
+        name = name.strip().lower()
+        if name == "xlsx":
+            name = EXCEL
+        if name and name not in formats:
+            formats.append(name)
+    unknown = [f for f in formats if f != EXCEL and f not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s) {unknown}; choose from {[EXCEL, *WRITERS]}")
+    return formats
+
+
+def _unique_headers(headers: Sequence[str]) -> List[str]:
+    """Column names for a frame: blanks get a position name, repeats a numeric suffix."""
+    names: List[str] = []
+    for idx, header in enumerate(headers, 1):
+        name = header or f"column_{idx}"
+        base, n = name, 2
+        while name in names:
+            name = f"{base} ({n})"
+            n += 1
+        names.append(name)
+    return names
+
+
+class ItemsCollector:
+    def __init__(self, field_names: Sequence[str]):
+        """Collect the long-format items table in memory; ``field_names`` become leading columns."""
+        self.field_names = list(field_names)
+        self._frames: List[pd.DataFrame] = []
+
+    def add(self, source_name: str, data: Dict[str, Any]) -> None:
+        """Add one PDF's extracted ``data``; PDFs without items add no rows."""
+        items = data.get("items")
+        if items is None or not len(items):
+            return
+        n = len(items)
+        frame: Dict[str, Any] = {"source_file": [source_name] * n}
+        for name in self.field_names:
+            value = data.get(name)
+            frame[name] = [None if value in ("", None) else value] * n
+        for header, name, column in zip(items.headers, _unique_headers(items.headers), items.columns):
+            kind = items.types.get(header)
+            if kind is int:
+                frame[name] = pd.array(column, dtype="Int64")
+            elif kind is float:
+                frame[name] = pd.array(column, dtype="Float64")
+            else:
+                frame[name] = pd.array(column, dtype="string")
+        self._frames.append(pd.DataFrame(frame))
+
+    def frame(self) -> pd.DataFrame:
+        """All added rows as one DataFrame; columns missing from a PDF are NA."""
+        if not self._frames:
+            return pd.DataFrame(columns=["source_file", *self.field_names])
+        return pd.concat(self._frames, ignore_index=True, sort=False)
+
+
+class ItemsWriter(ItemsCollector, ABC):
+    suffix = ""
+
+    def __init__(self, path: Path, field_names: Sequence[str]):
+        """Write the long-format items table to ``path`` on close; ``field_names`` become leading columns."""
+        super().__init__(field_names)
+        self.path = Path(path)
+
+    def close(self) -> Optional[Path]:
+        """Write the table; returns the output path, or None if no PDF had items."""
+        if not self._frames:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.write(self.frame())
+        self._frames = []
+        return self.path
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame) -> None:
+        """Write the combined table ``df`` to ``self.path``."""
+
+
+class CsvItemsWriter(ItemsWriter):
+    suffix = ".csv"
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.path, index=False)
+
+
+class ParquetItemsWriter(ItemsWriter):
+    suffix = ".parquet"
+
+    def __init__(self, path: Path, field_names: Sequence[str]):
+        # Fail before any PDF is processed rather than at the end of the run
+        if importlib.util.find_spec("pyarrow") is None and importlib.util.find_spec("fastparquet") is None:
+            raise ImportError("Parquet output needs pyarrow or fastparquet (pip install pyarrow)")
+        super().__init__(path, field_names)
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_parquet(self.path, index=False)
+
+
+class SqliteItemsWriter(ItemsWriter):
+    suffix = ".sqlite"
+    table = "items"
+
+    def write(self, df: pd.DataFrame) -> None:
+        with sqlite3.connect(self.path) as con:
+            df.to_sql(self.table, con, if_exists="replace", index=False, chunksize=10_000)
+            for column in ("source_file", "invoice_number"):
+                if column in df.columns:
+                    con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{self.table}_{column}" ON "{self.table}" ("{column}")')
+        con.close()
+
+
+WRITERS = {
+    "csv": CsvItemsWriter,
+    "parquet": ParquetItemsWriter,
+    "sqlite": SqliteItemsWriter,
+}
+
+
+def open_items_writers(formats: Sequence[str], output_dir: Path, base_name: str,
+                       field_names: Sequence[str]) -> List[ItemsWriter]:
+    """One writer per non-Excel format, writing ``<output_dir>/<base_name><suffix>``."""
+    writers = []
+    for name in formats:
+        if name == EXCEL:
+            continue
+        cls = WRITERS[name]
+        writers.append(cls(Path(output_dir) / f"{base_name}{cls.suffix}", field_names))
+    return writers